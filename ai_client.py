@@ -1,62 +1,246 @@
 
 """
 Enhanced AI client with grammar-based prompts, state tracking, and parameters
+
+google.generativeai is imported where it is first needed, so importing this
+module (tests, tooling, CLI help) does not pull in gRPC/protobuf
 """
-import google.generativeai as genai
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import copy
+import functools
+import sys
 from datetime import datetime
+import json
+from pathlib import Path
+import re
+import threading
 import time
 from config import Config
 from prompt_grammar import PromptGrammar
-from stateful_generator import StatefulHistoryGenerator
+from rate_limiter import RateLimiter
+from response_cache import ResponseCache, SemanticCache
+from stateful_generator import StatefulHistoryGenerator, stream_text
+
+@functools.lru_cache(maxsize=1)
+def _streamlit_ctx_getter():
+    """Import Streamlit's script-context probe once; None when Streamlit is not installed"""
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        return get_script_run_ctx
+    except ImportError:
+        return None
+
+def _streamlit_available():
+    """Check if Streamlit is available and in active context"""
+    # The context is per thread (batch workers have none), so only the import is cached
+    get_script_run_ctx = _streamlit_ctx_getter()
+    return get_script_run_ctx is not None and get_script_run_ctx() is not None
+
+def _embed_text(text):
+    """Embed text with the configured Gemini embedding model"""
+    import google.generativeai as genai
+    return genai.embed_content(model=Config.EMBEDDING_MODEL, content=text)["embedding"]
+
+# genai.configure() rebuilds the SDK's clients, so it runs once per process
+_genai_configured = False
+_genai_configure_lock = threading.Lock()
+
+def _configure_genai():
+    """Configure the Gemini SDK once so every generator shares the same gRPC channel"""
+    global _genai_configured
+    with _genai_configure_lock:
+        if not _genai_configured:
+            import google.generativeai as genai
+            genai.configure(api_key=Config.GEMINI_API_KEY, transport="grpc")
+            _genai_configured = True
+
+# The channel is shared by every generator (see _configure_genai), so it is
+# warmed up once per process rather than once per instance
+_warmed_up = False
+_warm_up_lock = threading.Lock()
+
+# Model listing is memoized per process: (fetched_at, available_model_names)
+_model_list_cache = None
+
+def _list_available_models():
+    """Return names of models supporting generateContent, refreshed after MODEL_LIST_CACHE_TTL"""
+    global _model_list_cache
+    if _model_list_cache and time.time() - _model_list_cache[0] < Config.MODEL_LIST_CACHE_TTL:
+        return _model_list_cache[1]
+
+    import google.generativeai as genai
+    available_models = tuple(
+        m.name for m in genai.list_models()
+        if "generateContent" in getattr(m, "supported_generation_methods", [])
+    )
+    _model_list_cache = (time.time(), available_models)
+    return available_models
+
+def _select_model(preferred, available_models):
+    """Pick the preferred model if available, else the first known fallback"""
+    fallback_models = [
+        preferred,
+        "models/gemini-1.5-flash",
+        "models/gemini-1.5-pro",
+        "models/gemini-2.0-flash-exp"
+    ]
+    
+    # Compare bare names so "models/x" and "x" match with one lookup per candidate
+    normalized = {name.replace("models/", ""): name for name in available_models}
+
+    selected = None
+    for candidate in fallback_models:
+        cand_norm = candidate.replace("models/", "")
+        if cand_norm in normalized:
+            selected = normalized[cand_norm]
+            break
+    
+    if not selected and available_models:
+        selected = available_models[0]
+    
+    if not selected:
+        raise RuntimeError("No suitable Gemini models found")
+    
+    return selected
+
+# Resolved model per preferred name: {preferred: resolved}
+_resolved_models = {}  # preferred -> (resolved_at, model name)
+
+def _read_model_cache(cache_file):
+    """Load the on-disk {preferred: {"model", "resolved_at"}} map, or {} if unusable"""
+    try:
+        cached = json.loads(cache_file.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return {}  # Missing or unreadable cache - fall through to a fresh lookup
+    return cached if isinstance(cached, dict) else {}
+
+def _resolve_model_name(preferred):
+    """
+    Resolve the model to use for `preferred`, skipping list_models() when a
+    resolution younger than MODEL_LIST_CACHE_TTL exists in memory or on disk
+    """
+    now = time.time()
+    entry = _resolved_models.get(preferred)
+    if entry and now - entry[0] < Config.MODEL_LIST_CACHE_TTL:
+        return entry[1]
+
+    cache_file = Path(Config.CACHE_DIR) / "model.json"
+    cached = _read_model_cache(cache_file)
+    try:
+        resolved_at, selected = cached[preferred]['resolved_at'], cached[preferred]['model']
+        if now - resolved_at < Config.MODEL_LIST_CACHE_TTL:
+            _resolved_models[preferred] = (resolved_at, selected)
+            return selected
+    except (KeyError, TypeError):
+        pass  # No entry for this model, or one in an older/malformed format
+
+    selected = _select_model(preferred, _list_available_models())
+    _resolved_models[preferred] = (now, selected)
+
+    # Merge into the existing file so resolutions for other preferred models survive
+    cached[preferred] = {"model": selected, "resolved_at": now}
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        cache_file.write_text(json.dumps(cached), encoding='utf-8')
+    except OSError as e:
+        print(f"⚠️ Could not cache model selection: {e}")
+
+    return selected
+
+# Metadata block parsing: "---" separator and "1. Name - Role: main" lines
+_SEPARATOR_RE = re.compile(r'\n-{3,}\s*\n')
+_CHAR_LINES_RE = re.compile(r'^[ \t]*\d+\.\s+(.+?)\s+-\s+Role:\s+(main|supporting|minor)\b',
+                            re.IGNORECASE | re.MULTILINE)
+
+# Canonical instances of the enum-like parameter values, so every result dict in
+# a large batch shares one string object per value instead of holding copies
+_PARAMETER_VALUES = {
+    value: sys.intern(value)
+    for value in (*Config.TIME_SPANS, *Config.EVENT_DENSITIES, *Config.NARRATIVE_FOCUSES)
+}
+
+# Persona name -> (instructions, temperature), resolved once per process
+_PERSONA_LOOKUP = {
+    name: (preset['instructions'], preset['temperature'])
+    for name, preset in Config.PERSONA_PRESETS.items()
+}
+_DEFAULT_PERSONA = _PERSONA_LOOKUP[Config.DEFAULT_PERSONA]
+
+# Shared across generator instances so batch runs and app sessions reuse outputs.
+# Only generations at or below RESPONSE_CACHE_MAX_TEMPERATURE are cacheable; when
+# neither TEMPERATURE nor any persona temperature qualifies, no cache is built.
+_CACHEABLE_TEMPERATURE = min(Config.TEMPERATURE, *(t for _, t in _PERSONA_LOOKUP.values()))
+_response_cache = (
+    ResponseCache(ttl=Config.RESPONSE_CACHE_TTL, db_path=Config.CACHE_DB_PATH or None)
+    if _CACHEABLE_TEMPERATURE <= Config.RESPONSE_CACHE_MAX_TEMPERATURE else None
+)
+_semantic_cache = SemanticCache(
+    embed_fn=_embed_text,
+    threshold=Config.SEMANTIC_CACHE_THRESHOLD,
+    db_path=(Config.CACHE_DB_PATH or None) if Config.SEMANTIC_CACHE_ENABLED else None
+)
+_rate_limiter = RateLimiter(requests_per_minute=Config.REQUESTS_PER_MINUTE)
 
 class HistoricalFictionGenerator:
     """Enhanced generator with course concepts applied"""
     
     def __init__(self):
         Config.validate()
-        genai.configure(api_key=Config.GEMINI_API_KEY)
-        
-        # Model selection with fallback
-        model_list = list(genai.list_models())
-        available_models = [
-            m.name for m in model_list
-            if "generateContent" in getattr(m, "supported_generation_methods", [])
-        ]
+        _configure_genai()
         
-        fallback_models = [
-            Config.MODEL_NAME,
-            "models/gemini-1.5-flash",
-            "models/gemini-1.5-pro",
-            "models/gemini-2.0-flash-exp"
-        ]
-        
-        selected = None
-        for candidate in fallback_models:
-            for available in available_models:
-                if candidate == available or candidate == available.replace("models/", "") or f"models/{candidate}" == available:
-                    selected = available
-                    break
-            if selected:
-                break
-        
-        if not selected and available_models:
-            selected = available_models[0]
-        
-        if not selected:
-            raise RuntimeError("No suitable Gemini models found")
+        # Model selection with fallback (cached in memory and on disk)
+        selected = _resolve_model_name(Config.MODEL_NAME)
         
         print(f"✓ Using model: {selected}")
         self.model_name = selected
+        import google.generativeai as genai
         self.model = genai.GenerativeModel(self.model_name)
-        
+        # One multi-stage helper per thread: it tracks entities between stages
+        self._stateful_local = threading.local()
+
+        # Open the API connection in the background so the first generate()
+        # doesn't pay connection/TLS setup on top of generation time
+        global _warmed_up
+        with _warm_up_lock:
+            if not _warmed_up:
+                _warmed_up = True
+                threading.Thread(target=self._warm_up, daemon=True).start()
+
+    def _warm_up(self):
+        """Best-effort tiny request (count_tokens) to establish the gRPC channel"""
+        try:
+            _rate_limiter.acquire()  # Counts against the same quota as generation
+            self.model.count_tokens("warmup")
+        except Exception:
+            pass
+
+    def _get_stateful_generator(self):
+        """Return this thread's StatefulHistoryGenerator, creating it on first use"""
+        stateful_gen = getattr(self._stateful_local, "generator", None)
+        if stateful_gen is None:
+            stateful_gen = StatefulHistoryGenerator(self.model, limiter=_rate_limiter)
+            self._stateful_local.generator = stateful_gen
+        return stateful_gen
+
     def generate(self, theme, custom_input="", time_span="moderate",
                 event_density="moderate", narrative_focus="political",
                 use_multi_stage=True, session_manager=None, num_characters=5,
-                persona_name="Smooth Storyteller"):
+                persona_name="Smooth Storyteller", use_cache=True):
         """
         Generate with ALL course concepts applied + NEW session integration
+        Pass use_cache=False to always call the model (e.g. to force a fresh sample)
         """
-        start_time = time.time()
+        start_time = time.perf_counter()
+        time_span = _PARAMETER_VALUES.get(time_span, time_span)
+        event_density = _PARAMETER_VALUES.get(event_density, event_density)
+        narrative_focus = _PARAMETER_VALUES.get(narrative_focus, narrative_focus)
+        parameters = {
+            "time_span": time_span,
+            "event_density": event_density,
+            "narrative_focus": narrative_focus,
+            "multi_stage": use_multi_stage
+        }
         
         try:
             # Get session manager (use provided or create temporary)
@@ -81,10 +265,7 @@ class HistoricalFictionGenerator:
                 )
 
             # Get persona instructions
-            from config import Config
-            persona_config = Config.PERSONA_PRESETS.get(persona_name, Config.PERSONA_PRESETS[Config.DEFAULT_PERSONA])
-            persona_instructions = persona_config['instructions']
-            persona_temperature = persona_config['temperature']
+            persona_instructions, persona_temperature = _PERSONA_LOOKUP.get(persona_name, _DEFAULT_PERSONA)
             
             # TECHNIQUE 1: Grammar-based prompt construction WITH character/causal context
             base_prompt = PromptGrammar.build_prompt(
@@ -100,25 +281,64 @@ class HistoricalFictionGenerator:
                 persona_instructions=persona_instructions
             )
 
-            def is_streamlit_available():
-                """Check if Streamlit is available and in active context"""
-                try:
-                    import streamlit as st
-                    from streamlit.runtime.scriptrunner import get_script_run_ctx
-                    return get_script_run_ctx() is not None
-                except:
-                    return False
-
-            # Then in your code:
-            if session_manager:
-                if is_streamlit_available():
-                    import streamlit as st
-                    with st.expander("View Generated Prompt", expanded=False):
-                        st.code(base_prompt, language="text")
+            in_streamlit = _streamlit_available()
+            if session_manager and in_streamlit:
+                import streamlit as st
+                with st.expander("View Generated Prompt", expanded=False):
+                    st.code(base_prompt, language="text")
             
+            # Response cache: same prompt + generation params reuses the stored output.
+            # Only deterministic (low temperature) generations are cacheable.
+            generation_temperature = persona_temperature if use_multi_stage else Config.TEMPERATURE
+            cache_key = None
+            if (use_cache and _response_cache is not None
+                    and generation_temperature <= Config.RESPONSE_CACHE_MAX_TEMPERATURE):
+                cache_key = ResponseCache.make_key(
+                    self.model_name, generation_temperature, Config.MAX_TOKENS,
+                    use_multi_stage, base_prompt
+                )
+            cached = _response_cache.get(cache_key) if cache_key else None
+            cache_hit = "exact" if cached else None
+
+            # Semantic cache: near-duplicate theme/custom input on a fresh story.
+            # Later events depend on roster/causal context, and multi-stage output
+            # depends on its own stage-1 skeleton, so both bypass it. Like the exact
+            # cache, it never hands back sampled (above-threshold) generations.
+            semantic_vector = None
+            semantic_scope = None
+            if (use_cache and not cached and Config.SEMANTIC_CACHE_ENABLED
+                    and not use_multi_stage and current_event == 1
+                    and generation_temperature <= Config.RESPONSE_CACHE_MAX_TEMPERATURE):
+                semantic_scope = (self.model_name, time_span, event_density,
+                                  narrative_focus, num_characters, persona_name)
+                semantic_vector = _semantic_cache.embed(f"{theme}\n{custom_input}")
+                cached = _semantic_cache.lookup(semantic_vector, semantic_scope)
+                cache_hit = "semantic" if cached else None
+
+            # Live preview: streamed text is rendered as it arrives, then cleared
+            # once the caller renders the finished chronology
+            stream_preview = None
+            on_chunk = None
+            if session_manager and in_streamlit and not cached:
+                stream_preview = st.empty()
+                streamed_parts = []
+
+                def _preview(text):
+                    streamed_parts.append(text)
+                    stream_preview.markdown("".join(streamed_parts))
+
+                on_chunk = _preview
+
             # TECHNIQUE 2 & 3: Multi-stage pipeline with state tracking
-            if use_multi_stage:
-                stateful_gen = StatefulHistoryGenerator(self.model)
+            if cached:
+                print(f"♻️ Using cached response ({cache_hit})")
+                content = cached["content"]
+                entities = cached["entities"]
+                stages_info = cached["stages_info"]
+
+            elif use_multi_stage:
+                stateful_gen = self._get_stateful_generator()
+                stateful_gen.reset()
                 result = stateful_gen.generate_with_state(
                     base_prompt=base_prompt,
                     theme=theme,
@@ -126,7 +346,8 @@ class HistoricalFictionGenerator:
                     stages=2,
                     temperature=persona_temperature,
                     max_tokens=Config.MAX_TOKENS,
-                    session_manager=session_manager  # Pass session manager
+                    session_manager=session_manager,  # Pass session manager
+                    on_chunk=on_chunk  # Streams the final stage only
                 )
                 
                 if not result["success"]:
@@ -137,22 +358,40 @@ class HistoricalFictionGenerator:
                 stages_info = result["stages"]
                 
             else:
-                # Single-stage generation
-                response = self.model.generate_content(
+                # Single-stage generation (streamed)
+                content = stream_text(
+                    self.model,
                     base_prompt,
                     generation_config={
                         "temperature": Config.TEMPERATURE,
                         "max_output_tokens": Config.MAX_TOKENS
-                    }
+                    },
+                    limiter=_rate_limiter,
+                    on_chunk=on_chunk
                 )
-                
-                content = self._extract_text(response)
                 entities = {}
                 stages_info = []
+
+            if stream_preview is not None:
+                stream_preview.empty()
             
             if not content:
                 raise Exception("No content generated")
-            
+
+            if cache_key and not cached:
+                _response_cache.set(cache_key, {
+                    "content": content,
+                    "entities": entities,
+                    "stages_info": stages_info
+                })
+
+            if semantic_vector is not None and not cached:
+                _semantic_cache.add(semantic_vector, semantic_scope, {
+                    "content": content,
+                    "entities": entities,
+                    "stages_info": stages_info
+                })
+
             # Update session with generated content
             event_node = session_manager.event_chain.add_event(current_event, content)
 
@@ -171,23 +410,23 @@ class HistoricalFictionGenerator:
                 if character_metadata:
                     # Extract from structured metadata (PREFERRED METHOD)
                     print(f"✅ Using structured metadata extraction")
-                    import re
-                    for char_line in character_metadata:
-                        # Parse: "1. King Aldric III - Role: main"
-                        match = re.match(r'^\d+\.\s+(.+?)\s+-\s+Role:\s+(main|supporting|minor)', char_line, re.IGNORECASE)
-                        if match:
-                            char_name = match.group(1).strip()
-                            role = match.group(2).strip().lower()
-                            
-                            if not session_manager.character_manager.get_character(char_name):
-                                session_manager.character_manager.add_character(char_name, role=role, event_num=current_event)
-                                print(f"  ✓ Added {char_name} ({role})")
+                    for char_name, role in character_metadata:
+                        if not session_manager.character_manager.get_character(char_name):
+                            session_manager.character_manager.add_character(char_name, role=role, event_num=current_event)
+                            print(f"  ✓ Added {char_name} ({role})")
+                elif len(session_manager.character_manager.roster) >= num_characters:
+                    # Roster already established (e.g. restored session) - the
+                    # heuristic text scan could only add unwanted extras
+                    print(f"✓ Roster already has {num_characters} characters, skipping text extraction")
                 else:
                     # Fallback to old method if metadata section not found
                     print(f"⚠️ Metadata section not found, falling back to text extraction")
                     extracted_chars = session_manager.character_manager.extract_characters_from_text(content, max_characters=num_characters)
                     for char_name in extracted_chars:
+                        if len(session_manager.character_manager.roster) >= num_characters:
+                            break
                         if not session_manager.character_manager.get_character(char_name):
+                            # Classified only when actually added, so names past a full roster cost nothing
                             role = session_manager.character_manager.determine_character_role(char_name, content)
                             session_manager.character_manager.add_character(char_name, role=role, event_num=current_event)
 
@@ -206,104 +445,77 @@ class HistoricalFictionGenerator:
             session_manager.increment_generation_count()
             
             word_count = len(content.split())
-            generation_time = time.time() - start_time
             
             # Build comprehensive result
-            result = {
-                "success": True,
-                "theme": theme,
-                "custom_input": custom_input,
-                "content": content,
-                "word_count": word_count,
-                "model": self.model_name,
-                "timestamp": datetime.now().isoformat(),
-                "generation_time_seconds": round(generation_time, 2),
-                "tokens_used": "-",
-                "prompt_tokens": "-",
-                "completion_tokens": "-",
-                "meets_requirements": Config.MIN_WORDS <= word_count <= Config.MAX_WORDS,
-                "error": None,
-                "parameters": {
-                    "time_span": time_span,
-                    "event_density": event_density,
-                    "narrative_focus": narrative_focus,
-                    "multi_stage": use_multi_stage
-                },
-                "entities_tracked": entities,
-                "stages": stages_info,
+            return self._build_result(
+                theme, custom_input, parameters, start_time,
+                success=True,
+                content=content,
+                word_count=word_count,
+                tokens_used="-",
+                prompt_tokens="-",
+                completion_tokens="-",
+                meets_requirements=Config.MIN_WORDS <= word_count <= Config.MAX_WORDS,
+                entities_tracked=entities,
+                stages=stages_info,
+                cache=cache_hit,
                 # NEW: Session information
-                "session_id": session_manager.session_id,
-                "event_number": current_event,
-                "character_validation": {
+                session_id=session_manager.session_id,
+                event_number=current_event,
+                character_validation={
                     "is_valid": is_valid,
                     "violations": violations
                 }
-            }
-            
-            return result
+            )
             
         except Exception as e:
-            generation_time = time.time() - start_time
-            return {
-                "success": False,
-                "theme": theme,
-                "custom_input": custom_input,
-                "content": None,
-                "word_count": 0,
-                "model": self.model_name,
-                "timestamp": datetime.now().isoformat(),
-                "generation_time_seconds": round(generation_time, 2),
-                "tokens_used": 0,
-                "meets_requirements": False,
-                "error": str(e),
-                "parameters": {
-                    "time_span": time_span,
-                    "event_density": event_density,
-                    "narrative_focus": narrative_focus,
-                    "multi_stage": use_multi_stage
-                },
-                "entities_tracked": {},
-                "stages": []
-            }
-
-    def _extract_text(self, response):
-        """Safely extract text from Gemini response"""
-        if hasattr(response, "candidates") and response.candidates:
-            for candidate in response.candidates:
-                if hasattr(candidate, "content") and hasattr(candidate.content, "parts"):
-                    for part in candidate.content.parts:
-                        if hasattr(part, "text"):
-                            return part.text
-        try:
-            return response.text
-        except:
-            return None
-    
+            return self._build_result(
+                theme, custom_input, parameters, start_time,
+                error=str(e)
+            )
+
+    def _build_result(self, theme, custom_input, parameters, start_time, **fields):
+        """
+        Build a generate() result dict: the fields shared by every outcome,
+        defaulting to a failed generation, overridden by `fields`
+        """
+        result = {
+            "success": False,
+            "theme": theme,
+            "custom_input": custom_input,
+            "content": None,
+            "word_count": 0,
+            "model": self.model_name,
+            "timestamp": datetime.now().isoformat(),
+            "generation_time_seconds": round(time.perf_counter() - start_time, 2),
+            "tokens_used": 0,
+            "meets_requirements": False,
+            "error": None,
+            "parameters": parameters,
+            "entities_tracked": {},
+            "stages": []
+        }
+        result.update(fields)
+        return result
+
     def _separate_content_and_metadata(self, raw_output):
         """
         Separate narrative content from character metadata section
         
         Returns:
-            tuple: (narrative_content, character_metadata_lines)
+            tuple: (narrative_content, [(character_name, role), ...])
         """
         # Look for the separator pattern
-        separator_pattern = r'\n-{3,}\s*\n'
-        
-        import re
-        match = re.search(separator_pattern, raw_output, re.IGNORECASE)
+        match = _SEPARATOR_RE.search(raw_output)
         
         if match:
             # Split at the separator
             narrative = raw_output[:match.start()].strip()
             metadata_section = raw_output[match.end():].strip()
             
-            # Extract character lines (format: "1. Name - Role: main")
-            char_lines = []
-            for line in metadata_section.split('\n'):
-                line = line.strip()
-                # Match: "1. Character Name - Role: main"
-                if re.match(r'^\d+\.\s+.+\s+-\s+Role:\s+(main|supporting|minor)', line, re.IGNORECASE):
-                    char_lines.append(line)
+            # Parse character lines (format: "1. Name - Role: main") in one scan
+            char_lines = [(name.strip(), role.lower())
+                          for name, role in _CHAR_LINES_RE.findall(metadata_section)]
             
             print(f"✅ Found metadata section with {len(char_lines)} characters")
             return narrative, char_lines
@@ -346,6 +558,13 @@ class HistoricalFictionGenerator:
         print(f"CHARACTER COUNT VALIDATION ENABLED")
         print(f"Target: {num_characters} characters | Max attempts: {max_retries + 1}")
         print(f"{'='*70}\\n")
+
+        # Session state before the first attempt; each retry rolls back to it
+        snapshot = (
+            session_manager.character_manager.snapshot(),
+            session_manager.event_chain.snapshot(),
+            session_manager.metadata.get('generation_count', 0)
+        )
         
         for attempt in range(max_retries + 1):
             print(f"\\n{'='*70}")
@@ -379,10 +598,10 @@ class HistoricalFictionGenerator:
                 print(f"   Resetting session and retrying with emphasis...")
                 print(f"   Attempts remaining: {max_retries - attempt}")
                 
-                # Reset session for retry
-                session_manager.character_manager.roster.clear()
-                session_manager.event_chain.events.clear()
-                session_manager.metadata['generation_count'] = 0
+                # Roll the session back for retry
+                session_manager.character_manager.restore(snapshot[0])
+                session_manager.event_chain.restore(snapshot[1])
+                session_manager.metadata['generation_count'] = snapshot[2]
                 
                 # Add strong emphasis to custom_input
                 original_input = kwargs.get('custom_input', '')
@@ -405,27 +624,92 @@ List all {num_characters} characters in the CHARACTERS section at the end.
         
         return result
 
-    def batch_generate(self, test_cases):
+    def _group_test_cases(self, test_cases):
         """
-        Generate content for multiple test cases
-        Now with enhanced parameter support
+        Group identical test cases by their effective generation parameters
+
+        Returns:
+            dict: {params_tuple: [positions in test_cases]} in first-seen order
         """
-        results = []
-        for i, test_case in enumerate(test_cases, 1):
-            print(f"Generating {i}/{len(test_cases)}: {test_case['theme']}")
-            
-            # Extract parameters from test case
-            result = self.generate(
-                theme=test_case['theme'],
-                custom_input=test_case.get('custom_input', ''),
-                time_span=test_case.get('time_span', 'moderate'),
-                event_density=test_case.get('event_density', 'moderate'),
-                narrative_focus=test_case.get('narrative_focus', 'political'),
-                use_multi_stage=test_case.get('use_multi_stage', True)
+        positions = {}
+        for index, test_case in enumerate(test_cases):
+            params = (
+                test_case['theme'],
+                test_case.get('custom_input', ''),
+                test_case.get('time_span', 'moderate'),
+                test_case.get('event_density', 'moderate'),
+                test_case.get('narrative_focus', 'political'),
+                test_case.get('use_multi_stage', True)
             )
-            results.append(result)
-            
-            if i < len(test_cases):
-                time.sleep(1)
-        
+            positions.setdefault(params, []).append(index)
+
+        if len(positions) < len(test_cases):
+            print(f"Skipping {len(test_cases) - len(positions)} duplicate test case(s)")
+        return positions
+
+    def _run_test_case(self, i, total, params, use_cache=True):
+        """Generate one grouped test case"""
+        theme, custom_input, time_span, event_density, narrative_focus, use_multi_stage = params
+        print(f"Generating {i}/{total}: {theme}")
+
+        return self.generate(
+            theme=theme,
+            custom_input=custom_input,
+            time_span=time_span,
+            event_density=event_density,
+            narrative_focus=narrative_focus,
+            use_multi_stage=use_multi_stage,
+            use_cache=use_cache
+        )
+
+    def _scatter_results(self, test_cases, positions, grouped_results):
+        """Place each group's result into every position it came from"""
+        results = [None] * len(test_cases)
+        for params, result in zip(positions, grouped_results):
+            first, *duplicates = positions[params]
+            results[first] = result
+            for index in duplicates:
+                results[index] = copy.deepcopy(result)
         return results
+
+    def batch_generate(self, test_cases, use_cache=True):
+        """
+        Generate content for multiple test cases
+        Runs up to Config.MAX_CONCURRENCY cases at once; each API call is
+        paced by the shared rate limiter. Identical cases are generated once
+        and the result is copied into each of their slots. Results are
+        returned in the same order as test_cases.
+        """
+        positions = self._group_test_cases(test_cases)
+        total = len(positions)
+
+        with ThreadPoolExecutor(max_workers=max(1, Config.MAX_CONCURRENCY)) as executor:
+            futures = [
+                executor.submit(self._run_test_case, i, total, params, use_cache)
+                for i, params in enumerate(positions, 1)
+            ]
+            grouped_results = [future.result() for future in futures]
+
+        return self._scatter_results(test_cases, positions, grouped_results)
+
+    async def batch_generate_async(self, test_cases, max_concurrency=None, use_cache=True):
+        """
+        Async variant of batch_generate for callers already running an event loop
+
+        Each case runs in a worker thread, at most `max_concurrency` at a time
+        (defaults to Config.MAX_CONCURRENCY), so the loop stays responsive.
+        Results are returned in the same order as test_cases.
+        """
+        positions = self._group_test_cases(test_cases)
+        total = len(positions)
+        semaphore = asyncio.Semaphore(max(1, max_concurrency or Config.MAX_CONCURRENCY))
+
+        async def run_bounded(i, params):
+            async with semaphore:
+                return await asyncio.to_thread(self._run_test_case, i, total, params, use_cache)
+
+        grouped_results = await asyncio.gather(*[
+            run_bounded(i, params) for i, params in enumerate(positions, 1)
+        ])
+
+        return self._scatter_results(test_cases, positions, grouped_results)
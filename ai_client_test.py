@@ -0,0 +1,180 @@
+
+import json
+import os
+import tempfile
+import threading
+import ai_client
+from ai_client import HistoricalFictionGenerator, _resolve_model_name, _select_model
+from config import Config
+from response_cache import ResponseCache
+from session_manager import SessionManager
+
+STORY = (
+    "Queen Lyra rallied the northern lords against the usurper.\n"
+    "---\n"
+    "CHARACTERS:\n"
+    "1. Queen Lyra - Role: main\n"
+)
+
+class FakeChunk:
+    def __init__(self, text):
+        self.text = text
+
+class FakeModel:
+    """Stands in for genai.GenerativeModel: streams STORY and counts calls"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def generate_content(self, prompt, generation_config=None, stream=False):
+        self.calls += 1
+        return [FakeChunk(part) for part in STORY.split(" ")]
+
+def make_generator(model):
+    """Generator wired to a fake model, skipping API configuration in __init__"""
+    generator = object.__new__(HistoricalFictionGenerator)
+    generator.model_name = "models/test-model"
+    generator.model = model
+    generator._stateful_local = threading.local()
+    return generator
+
+def test_select_model():
+    print("=== Testing Model Selection ===\n")
+
+    print("1. Preferred model, with or without the models/ prefix...")
+    available = ["models/gemini-1.5-pro", "models/gemini-2.5-flash"]
+    assert _select_model("gemini-2.5-flash", available) == "models/gemini-2.5-flash"
+    assert _select_model("models/gemini-2.5-flash", available) == "models/gemini-2.5-flash"
+
+    print("2. Fallbacks, then the first available model...")
+    assert _select_model("gemini-missing", available) == "models/gemini-1.5-pro"
+    assert _select_model("gemini-missing", ["models/other"]) == "models/other"
+
+    print("3. Nothing available...")
+    try:
+        _select_model("gemini-2.5-flash", [])
+        assert False, "expected RuntimeError"
+    except RuntimeError:
+        pass
+
+    print("\n✅ All tests passed!")
+
+def test_resolve_model_name():
+    print("=== Testing Model Resolution Cache ===\n")
+
+    lookups = []
+    original_list = ai_client._list_available_models
+    original_dir, original_ttl = Config.CACHE_DIR, Config.MODEL_LIST_CACHE_TTL
+    ai_client._list_available_models = lambda: lookups.append(1) or ["models/gemini-2.5-flash"]
+    ai_client._resolved_models.clear()
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            Config.CACHE_DIR = tmp_dir
+            Config.MODEL_LIST_CACHE_TTL = 3600
+            cache_file = os.path.join(tmp_dir, "model.json")
+            with open(cache_file, "w", encoding="utf-8") as f:
+                json.dump({"other-model": {"model": "models/other", "resolved_at": 0}}, f)
+
+            print("1. First resolution lists models and merges into model.json...")
+            assert _resolve_model_name("gemini-2.5-flash") == "models/gemini-2.5-flash"
+            assert len(lookups) == 1
+            with open(cache_file, encoding="utf-8") as f:
+                on_disk = json.load(f)
+            assert set(on_disk) == {"other-model", "gemini-2.5-flash"}
+
+            print("2. Memory, then disk, serve later resolutions...")
+            assert _resolve_model_name("gemini-2.5-flash") == "models/gemini-2.5-flash"
+            ai_client._resolved_models.clear()
+            assert _resolve_model_name("gemini-2.5-flash") == "models/gemini-2.5-flash"
+            assert len(lookups) == 1
+
+            print("3. Expired resolutions are looked up again...")
+            Config.MODEL_LIST_CACHE_TTL = -1
+            assert _resolve_model_name("gemini-2.5-flash") == "models/gemini-2.5-flash"
+            assert len(lookups) == 2
+    finally:
+        ai_client._list_available_models = original_list
+        Config.CACHE_DIR, Config.MODEL_LIST_CACHE_TTL = original_dir, original_ttl
+        ai_client._resolved_models.clear()
+
+    print("\n✅ All tests passed!")
+
+def test_generate_cache_hit():
+    print("=== Testing Response Cache in generate() ===\n")
+
+    original_cache = ai_client._response_cache
+    original_max, original_semantic = Config.RESPONSE_CACHE_MAX_TEMPERATURE, Config.SEMANTIC_CACHE_ENABLED
+    ai_client._response_cache = ResponseCache(ttl=60)
+    Config.RESPONSE_CACHE_MAX_TEMPERATURE = Config.TEMPERATURE
+    Config.SEMANTIC_CACHE_ENABLED = False
+    try:
+        model = FakeModel()
+        generator = make_generator(model)
+        params = dict(theme="Fantasy Kingdom", use_multi_stage=False, num_characters=1)
+
+        print("1. First generation calls the model...")
+        first = generator.generate(session_manager=SessionManager(), **params)
+        assert first["success"], first["error"]
+        assert first["cache"] is None
+        assert model.calls == 1
+
+        print("2. Same prompt is served from the cache...")
+        second = generator.generate(session_manager=SessionManager(), **params)
+        assert second["success"] and second["cache"] == "exact"
+        assert second["content"] == first["content"]
+        assert model.calls == 1
+
+        print("3. use_cache=False always calls the model...")
+        generator.generate(session_manager=SessionManager(), use_cache=False, **params)
+        assert model.calls == 2
+
+        print("4. Temperatures above the limit bypass the cache...")
+        Config.RESPONSE_CACHE_MAX_TEMPERATURE = Config.TEMPERATURE - 0.1
+        third = generator.generate(session_manager=SessionManager(), **params)
+        assert third["cache"] is None
+        assert model.calls == 3
+    finally:
+        ai_client._response_cache = original_cache
+        Config.RESPONSE_CACHE_MAX_TEMPERATURE, Config.SEMANTIC_CACHE_ENABLED = original_max, original_semantic
+
+    print("\n✅ All tests passed!")
+
+def test_batch_dedupe():
+    print("=== Testing Batch Deduplication ===\n")
+
+    generator = make_generator(FakeModel())
+    calls = []
+
+    def fake_generate(**kwargs):
+        calls.append(kwargs["theme"])
+        return {"success": True, "theme": kwargs["theme"], "entities_tracked": {"characters": []}}
+
+    generator.generate = fake_generate
+    test_cases = [
+        {"theme": "Rome"},
+        {"theme": "Egypt"},
+        {"theme": "Rome", "custom_input": ""},
+        {"theme": "Rome", "use_multi_stage": False},
+    ]
+
+    print("1. Grouping identical cases...")
+    positions = generator._group_test_cases(test_cases)
+    assert list(positions.values()) == [[0, 2], [1], [3]]
+
+    print("2. Each group is generated once and scattered back in order...")
+    results = generator.batch_generate(test_cases)
+    assert sorted(calls) == ["Egypt", "Rome", "Rome"]
+    assert [r["theme"] for r in results] == ["Rome", "Egypt", "Rome", "Rome"]
+
+    print("3. Duplicate slots hold independent copies...")
+    assert results[2] == results[0] and results[2] is not results[0]
+    results[2]["entities_tracked"]["characters"].append("Caesar")
+    assert results[0]["entities_tracked"]["characters"] == []
+
+    print("\n✅ All tests passed!")
+
+if __name__ == "__main__":
+    test_select_model()
+    test_resolve_model_name()
+    test_generate_cache_hit()
+    test_batch_dedupe()
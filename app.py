@@ -4,28 +4,24 @@ Professional UI for GenAI Historical Fiction Tool
 Instructor evaluation-friendly with all parameters exposed
 """
 import streamlit as st
-import json
 from datetime import datetime
 from pathlib import Path
 from ai_client import HistoricalFictionGenerator
 from config import Config
-import sys
+from input_validator import InputValidator
+from session_manager import SessionManager, dump_json
 import os
+import re
+import tempfile
+from bisect import bisect_right
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 
-#from input_validator import InputValidator 
 
-st.session_state.needs_rerun = False
-
-# Page configuration
-st.set_page_config(
-    page_title="Historical Fiction Generator",
-    page_icon="📚",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
-
-# Custom CSS for better styling
-st.markdown("""
+# Static page content, defined once instead of inline in the render flow.
+# The CSS is still emitted every rerun: Streamlit drops elements a rerun
+# doesn't re-render, so injecting it only once would lose the styling.
+_CSS = """
     <style>
     .main-header {
         font-size: 2.5rem;
@@ -66,27 +62,14 @@ st.markdown("""
         background-color: #1E40AF;
     }
     </style>
-    """, unsafe_allow_html=True)
+    """
 
-# Initialize session state
-if 'generator' not in st.session_state:
-    try:
-        from session_manager import SessionManager
-        st.session_state.generator = HistoricalFictionGenerator()
-        st.session_state.generation_history = []
-        st.session_state.session_manager = SessionManager()
-        st.session_state.current_session_id = st.session_state.session_manager.session_id
-    except Exception as e:
-        st.error(f"❌ Failed to initialize generator: {str(e)}")
-        st.info("💡 Make sure your `.env` file is configured with GEMINI_API_KEY")
-        st.stop()
-
-# Header
-st.markdown('<div class="main-header">📚 Historical Fiction Generator</div>', unsafe_allow_html=True)
-st.markdown('<div class="sub-header">AI-Powered Chronology Generation with Advanced PCG Techniques</div>', unsafe_allow_html=True)
+_HEADER_HTML = (
+    '<div class="main-header">📚 Historical Fiction Generator</div>'
+    '<div class="sub-header">AI-Powered Chronology Generation with Advanced PCG Techniques</div>'
+)
 
-with st.expander("ℹ️ About This Tool - Click to Learn More", expanded=False):
-    st.markdown("""
+_ABOUT_MD = """
     ### 🎓 **Concepts Implemented**
     
     This tool demonstrates advanced **Procedural Content Generation (PCG)** techniques:
@@ -177,7 +160,378 @@ with st.expander("ℹ️ About This Tool - Click to Learn More", expanded=False)
     7. **Monitor character fates** in the Character Roster (deaths/revivals tracked automatically)
     8. **Save your session** to preserve all progress
     9. **Export your results** in TXT or JSON format
-    """)
+    """
+
+# Session names: letters, digits, underscores and hyphens only
+_SESSION_NAME_RE = re.compile(r'^[\w\-]+\Z')
+
+# Sidebar parameter captions
+_TIME_SPAN_ESTIMATES = {
+    'brief': '500-700',
+    'moderate': '650-900',
+    'epic': '800-1000'
+}
+_EVENT_COUNTS = {
+    'sparse': '3-5 events',
+    'moderate': '5-8 events',
+    'rich': '8-12 events'
+}
+# Generation Preview: (time_span, event_density) -> (estimated_words, estimated_events).
+# Words scale the 750 midpoint of the 500-1000 range and are clamped to it.
+_TIME_MULTIPLIERS = {'brief': 0.7, 'moderate': 0.85, 'epic': 1.0}
+_DENSITY_MULTIPLIERS = {'sparse': 0.8, 'moderate': 1.0, 'rich': 1.2}
+_EVENT_BASE = {'sparse': 4, 'moderate': 6, 'rich': 10}
+_ESTIMATES = {
+    (time_span, density): (max(500, min(1000, int(750 * time_mult * density_mult))), _EVENT_BASE[density])
+    for time_span, time_mult in _TIME_MULTIPLIERS.items()
+    for density, density_mult in _DENSITY_MULTIPLIERS.items()
+}
+_FOCUS_ICONS = {
+    'political': '🏛️',
+    'cultural': '🎨',
+    'military': '⚔️',
+    'economic': '💰',
+    'personal': '👥'
+}
+# Event chain expanders rendered before "Show all events" is ticked
+_EVENT_CHAIN_WINDOW = 10
+
+# Word count bands: < 500, 500-1000, 1001-1200, > 1200 (lower bound of each band after the first)
+_WORD_COUNT_THRESHOLDS = (500, 1001, 1201)
+_WORD_COUNT_STATUS = (
+    ("⚠️", "Under target", "orange"),
+    ("✅", "Within target", "green"),
+    ("⚠️", "Slightly over", "orange"),
+    ("❌", "Significantly over", "red"),
+)
+_ROLE_EMOJI = {
+    'main': '⭐',
+    'supporting': '✅',
+    'minor': '○'
+}
+
+
+# How long a rerun waits on a queued save before reporting it as still in progress
+_SAVE_WAIT_SECONDS = 2.0
+
+# Separator between the narrative and the JSON metadata in saved output files
+_METADATA_HEADER = ("\n\n" + "=" * 60 + "\nMETADATA\n" + "=" * 60 + "\n").encode('utf-8')
+
+
+def _write_atomic(path, data):
+    """Write bytes to path via a temp file + os.replace, so readers never see a partial file"""
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    # Unique temp name per write, so concurrent saves never share a temp file
+    tmp = tempfile.NamedTemporaryFile(dir=directory, suffix='.tmp', delete=False)
+    try:
+        with tmp:
+            tmp.write(data)
+        os.replace(tmp.name, path)
+    except BaseException:
+        os.unlink(tmp.name)
+        raise
+
+
+@st.cache_resource
+def _get_io_pool():
+    """Process-wide worker pool for file exports, so saving never blocks a rerun"""
+    return ThreadPoolExecutor(max_workers=2, thread_name_prefix="export")
+
+
+@st.cache_resource(show_spinner=False)
+def _get_generator():
+    """One generator per process: every browser session shares the Gemini client"""
+    return HistoricalFictionGenerator()
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _session_options(sessions_mtime):
+    """
+    Load-dropdown options {label: session_id} for the saved sessions
+
+    Cached so reruns don't re-read every session file; keyed on the sessions
+    directory mtime and cleared explicitly after save/rename/delete
+    """
+    available_sessions = SessionManager.list_available_sessions()
+
+    # Group sessions by theme for better organization
+    sessions_by_theme = {}
+    for s in available_sessions:
+        theme_key = s['theme'] or 'Untitled'
+        if theme_key not in sessions_by_theme:
+            sessions_by_theme[theme_key] = []
+        sessions_by_theme[theme_key].append(s)
+    
+    # Create human-readable session options
+    session_options = {}
+    for theme_key, sessions in sessions_by_theme.items():
+        for s in sessions:
+            # Extract readable name from session_id
+            display_name = s['session_id'].replace('_', ' ')
+            
+            # Add metadata for context
+            events = s.get('events', 0)
+            chars = s.get('characters', 0)
+            last_mod = s.get('last_modified', '')
+            
+            # Parse timestamp
+            try:
+                mod_time = datetime.fromisoformat(last_mod)
+                time_str = mod_time.strftime("%b %d, %H:%M")
+            except:
+                time_str = "Unknown"
+            
+            # Build display string
+            option_text = f"📖 {display_name} • {events} events, {chars} chars • {time_str}"
+            session_options[option_text] = s['session_id']
+    return session_options
+
+
+@st.cache_data(max_entries=128, show_spinner=False)
+def _validate_input(text):
+    """InputValidator.validate memoized per text: reruns and backspacing reuse results"""
+    return InputValidator.validate(text)
+
+
+def _report_saves():
+    """
+    Show the outcome of queued background saves
+
+    Each save is waited on briefly, so a quick write reports in the same run;
+    slower ones stay pending in session state and report on a later rerun.
+    """
+    still_pending = []
+    for filename, future in st.session_state.get('pending_saves', ()):
+        try:
+            future.result(timeout=_SAVE_WAIT_SECONDS)
+        except FutureTimeoutError:
+            still_pending.append((filename, future))
+            st.info(f"⏳ Saving to: {filename}")
+        except Exception as e:
+            st.error(f"❌ Error saving file: {e}")
+        else:
+            st.success(f"✅ Saved to: {filename}")
+    st.session_state.pending_saves = still_pending
+
+
+def _active_roster_rows(active_chars):
+    """(line, caption) per active character; caption is the latest action or None"""
+    rows = []
+    for char in active_chars:  # Already ordered by role
+        # Role-based emoji
+        role_emoji = _ROLE_EMOJI.get(char.role, '✅')
+        actions = char.notable_actions
+        
+        # Build display string (sparkle marks a revival)
+        parts = [f"{role_emoji} **{char.name}** ({char.role})"]
+        if char.revival_event:
+            parts.append("✨")
+        parts.append(f"• Introduced: Event {char.first_appearance}")
+        if char.revival_event:
+            parts.append(f"• Revived: Event {char.revival_event}")
+        if actions:
+            parts.append(f"• {len(actions)} actions")
+        
+        # Latest action is shown in small text below the line
+        caption = None
+        if actions:
+            latest_action = actions[-1]
+            
+            # 🆕 HIGHLIGHT REVIVAL IN LATEST ACTION
+            if latest_action.startswith("Revived:"):
+                caption = f"✨ {latest_action}"
+            else:
+                caption = f"Latest: {latest_action}"
+        rows.append((" ".join(parts), caption))
+    return rows
+
+
+def _truncate(text, limit):
+    """Shorten long captions with a trailing ellipsis"""
+    return text[:limit] + "..." if len(text) > limit else text
+
+
+def _deceased_entry(char):
+    """(heading, captions) for the Deceased Characters expander"""
+    captions = [f"└─ Died in Event {char.death_event if char.death_event else 'Unknown'}"]
+
+    # Show death cause if available
+    cause = char.lifecycle()[0]
+    if cause:
+        captions.append(f"└─ Cause: {cause}")
+
+    return f"💀 **{char.name}** ({char.role})", captions
+
+
+def _revival_entry(char):
+    """(heading, captions) for the revival history expander"""
+    # Determine current status
+    status_emoji = "✅" if char.status == "alive" else "💀"
+    heading = f"🔄 **{char.name}** ({char.role}) - {status_emoji} {char.status.upper()}"
+
+    # One pass over notable_actions for causes and counts
+    death_action, revival_reason, death_count, revival_count = char.lifecycle()
+    captions = []
+
+    # Death info
+    if char.death_event:
+        captions.append(f"├─ 💀 Died: Event {char.death_event}")
+        if death_action:
+            captions.append(f"│  └─ {_truncate(death_action, 80)}")
+
+    # Revival info
+    if char.revival_event:
+        captions.append(f"├─ ✨ Revived: Event {char.revival_event}")
+        if revival_reason:
+            if " - " in revival_reason:
+                # Format: "via magic - context..."
+                mechanism, context = revival_reason.split(" - ", 1)
+                captions.append(f"│  ├─ Method: {mechanism}")
+                if context:
+                    captions.append(f"│  └─ {_truncate(context, 100)}")
+            else:
+                captions.append(f"│  └─ {_truncate(revival_reason, 100)}")
+
+    # Lifecycle stats
+    if death_count > 1 or revival_count > 1:
+        captions.append(f"└─ 📊 Deaths: {death_count} | Revivals: {revival_count}")
+
+    return heading, captions
+
+
+def _entry_blocks(entries):
+    """(heading, caption block) per entry, the captions joined into one st.caption"""
+    return [(heading, "  \n".join(captions)) for heading, captions in entries]
+
+
+def _render_entries(entries):
+    """
+    Heading plus one caption block per character, as the roster expanders show them
+
+    Still a few elements per character: the captions keep st.caption styling,
+    which a single joined markdown string could only approximate.
+    """
+    for heading, captions in entries:
+        st.markdown(heading)
+        if captions:
+            st.caption(captions)
+        st.markdown("")  # Spacer between characters
+
+
+def _roster_display(character_manager):
+    """
+    Display text for the roster column: (active rows, deceased, revival history)
+
+    Built once per roster change (every mutation bumps the manager's version)
+    and reused from session state on other reruns.
+    """
+    cached = st.session_state.get('roster_display_cache')
+    if cached and cached[0] is character_manager and cached[1] == character_manager.version:
+        return cached[2]
+
+    active, deceased, revived = character_manager.partition_roster()
+    display = (
+        _active_roster_rows(active),
+        _entry_blocks(_deceased_entry(char) for char in deceased),
+        _entry_blocks(_revival_entry(char) for char in revived),
+    )
+    st.session_state.roster_display_cache = (character_manager, character_manager.version, display)
+    return display
+
+
+# Partial reruns need st.fragment (Streamlit 1.37+, experimental from 1.33);
+# on older versions the decorated function simply runs with the whole page
+_fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None) or (lambda func: func)
+
+# Static HTML skips the markdown parser with st.html (Streamlit 1.33+);
+# older versions fall back to markdown with raw HTML allowed
+_html = getattr(st, "html", None) or (lambda body: st.markdown(body, unsafe_allow_html=True))
+
+
+@_fragment
+def _export_panel(result):
+    """Export options for a successful result (TXT/JSON download, save to output/)"""
+    content = result.get('content', '')
+
+    # Export filename stamp and TXT/JSON payloads are derived once per result, not on every rerun
+    export_key = (result.get('timestamp'), result.get('theme'), result.get('word_count'))
+    export = st.session_state.get('export_cache')
+    if not export or export[0] != export_key:
+        try:
+            export_ts = datetime.fromisoformat(result['timestamp']).strftime("%Y%m%d_%H%M%S")
+        except (KeyError, TypeError, ValueError):
+            export_ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+        export = (export_key, export_ts, content.encode('utf-8'), dump_json(result))
+        st.session_state.export_cache = export
+    _, export_ts, txt_data, json_data = export
+
+    # === EXPORT OPTIONS ===
+    st.markdown("---")
+    st.markdown("### 💾 Export Options")
+
+    export_col1, export_col2, export_col3 = st.columns(3)
+
+    with export_col1:
+        st.download_button(
+            label="📄 Download TXT",
+            data=txt_data,
+            file_name=f"{result.get('theme', 'chronology')}_{export_ts}.txt",
+            mime="text/plain"
+        )
+
+    with export_col2:
+        st.download_button(
+            label="📊 Download JSON",
+            data=json_data,
+            file_name=f"{result.get('theme', 'chronology')}_{export_ts}.json",
+            mime="application/json"
+        )
+
+    with export_col3:
+        if st.button("💾 Save to Output Folder"):
+            try:
+                # Generate filename
+                theme_clean = result.get('theme', 'chronology').replace(' ', '_')
+                filename = f"output/{theme_clean}_{export_ts}.txt"
+
+                # Narrative + reused JSON metadata bytes, written in one call in the background
+                payload = b"".join((txt_data, _METADATA_HEADER, json_data))
+                future = _get_io_pool().submit(_write_atomic, filename, payload)
+                st.session_state.setdefault('pending_saves', []).append((filename, future))
+            except Exception as e:
+                st.error(f"❌ Error saving file: {e}")
+        _report_saves()
+
+
+# Page configuration
+st.set_page_config(
+    page_title="Historical Fiction Generator",
+    page_icon="📚",
+    layout="wide",
+    initial_sidebar_state="expanded"
+)
+
+# Custom CSS for better styling
+_html(_CSS)
+
+# Initialize session state
+if 'generator' not in st.session_state:
+    try:
+        st.session_state.generator = _get_generator()
+        st.session_state.generation_history = deque(maxlen=5)  # Only the latest are shown
+        st.session_state.session_manager = SessionManager()
+        st.session_state.current_session_id = st.session_state.session_manager.session_id
+    except Exception as e:
+        st.error(f"❌ Failed to initialize generator: {str(e)}")
+        st.info("💡 Make sure your `.env` file is configured with GEMINI_API_KEY")
+        st.stop()
+
+# Header
+_html(_HEADER_HTML)
+
+with st.expander("ℹ️ About This Tool - Click to Learn More", expanded=False):
+    st.markdown(_ABOUT_MD)
 
 st.markdown("---")  # Separator line
 
@@ -189,8 +543,6 @@ with st.sidebar:
     st.subheader("💾 Session Management")
 
     # Initialize flags (at top of script, only once)
-    if 'pending_action' not in st.session_state:
-        st.session_state.pending_action = None
     if 'confirm_new_session' not in st.session_state:
         st.session_state.confirm_new_session = False
 
@@ -220,6 +572,7 @@ with st.sidebar:
             if st.button("💾 Save", use_container_width=True, type="primary"):
                 try:
                     filepath = current_session.save()
+                    _session_options.clear()
                     st.success("✅ Saved!")
                     # Extract just filename
                     filename = Path(filepath).name
@@ -237,24 +590,22 @@ with st.sidebar:
             # Show confirmation button
             if st.button("⚠️ Confirm New", use_container_width=True, type="secondary", key="confirm_new_btn"):
                 # Create new session
-                from session_manager import SessionManager
                 st.session_state.session_manager = SessionManager()
                 st.session_state.current_session_id = st.session_state.session_manager.session_id
                 st.session_state.confirm_new_session = False  # Reset flag
-                st.session_state.pending_action = 'new'
+                st.rerun()
         else:
             # Show normal new button
             if st.button("🔄 New", use_container_width=True, key="new_btn", help="Start new session"):
                 if gen_count > 0:
                     # Has content - need confirmation
                     st.session_state.confirm_new_session = True
-                    st.session_state.pending_action = 'new_confirm'  # Trigger rerun to show confirm button
+                    st.rerun()  # Show the confirm button
                 else:
                     # No content - safe to reset immediately
-                    from session_manager import SessionManager
                     st.session_state.session_manager = SessionManager()
                     st.session_state.current_session_id = st.session_state.session_manager.session_id
-                    st.session_state.pending_action = 'new'
+                    st.rerun()
 
     with col3:
         if gen_count > 0:
@@ -272,8 +623,7 @@ with st.sidebar:
                 
                 if st.button("💾 Update Name", key="rename_btn"):
                     # Validate name
-                    import re
-                    if re.match(r'^[\w\-]+$', new_name) and new_name != current_name:
+                    if _SESSION_NAME_RE.match(new_name) and new_name != current_name:
                         # Rename session
                         old_filepath = current_session.sessions_dir / f"{current_name}.json"
                         
@@ -286,10 +636,11 @@ with st.sidebar:
                         # Delete old file
                         if old_filepath.exists():
                             old_filepath.unlink()
+                        _session_options.clear()
                         
                         st.success(f"✅ Renamed to: {new_name}")
                         st.session_state.current_session_id = new_name
-                        st.session_state.needs_rerun = True
+                        st.rerun()
 
     # Show warning message if in confirmation state
     if st.session_state.confirm_new_session:
@@ -297,91 +648,56 @@ with st.sidebar:
 
     # Load existing sessions
     st.markdown("")  # Spacing
-    from session_manager import SessionManager
-    available_sessions = SessionManager.list_available_sessions()
+    sessions_dir = Path('sessions')
+    sessions_mtime = sessions_dir.stat().st_mtime if sessions_dir.exists() else 0.0
+    session_options = _session_options(sessions_mtime)
 
-    if available_sessions:
+    if session_options:
         with st.expander("📂 Load Previous Session", expanded=False):
-            # Group sessions by theme for better organization
-            sessions_by_theme = {}
-            for s in available_sessions:
-                theme_key = s['theme'] or 'Untitled'
-                if theme_key not in sessions_by_theme:
-                    sessions_by_theme[theme_key] = []
-                sessions_by_theme[theme_key].append(s)
+            selected = st.selectbox(
+                "Choose a session to load:",
+                options=list(session_options.keys()),
+                key="session_select",
+                label_visibility="collapsed"
+            )
             
-            # Create human-readable session options
-            session_options = {}
-            for theme_key, sessions in sessions_by_theme.items():
-                for s in sessions:
-                    # Extract readable name from session_id
-                    display_name = s['session_id'].replace('_', ' ')
-                    
-                    # Add metadata for context
-                    events = s.get('events', 0)
-                    chars = s.get('characters', 0)
-                    last_mod = s.get('last_modified', '')
-                    
-                    # Parse timestamp
+            col_load, col_delete = st.columns([3, 1])
+            
+            with col_load:
+                if st.button("📂 Load Selected", key="load_btn", use_container_width=True, type="primary"):
                     try:
-                        from datetime import datetime
-                        mod_time = datetime.fromisoformat(last_mod)
-                        time_str = mod_time.strftime("%b %d, %H:%M")
-                    except:
-                        time_str = "Unknown"
-                    
-                    # Build display string
-                    option_text = f"📖 {display_name} • {events} events, {chars} chars • {time_str}"
-                    session_options[option_text] = s['session_id']
+                        session_id = session_options[selected]
+                        st.session_state.session_manager = SessionManager.load(session_id)
+                        st.session_state.current_session_id = session_id
+                        st.success(f"✅ Loaded successfully!")
+                        st.rerun()
+                    except Exception as e:
+                        st.error(f"❌ Load failed: {e}")
             
-            if session_options:
-                selected = st.selectbox(
-                    "Choose a session to load:",
-                    options=list(session_options.keys()),
-                    key="session_select",
-                    label_visibility="collapsed"
-                )
+            with col_delete:
+                # Initialize session state for delete confirmation
+                if 'delete_confirm_id' not in st.session_state:
+                    st.session_state.delete_confirm_id = None
                 
-                col_load, col_delete = st.columns([3, 1])
+                session_id = session_options[selected]
                 
-                with col_load:
-                    if st.button("📂 Load Selected", key="load_btn", use_container_width=True, type="primary"):
+                # First click: Show confirmation state
+                if st.session_state.delete_confirm_id != session_id:
+                    if st.button("🗑️", key="delete_btn", help="Delete selected session"):
+                        st.session_state.delete_confirm_id = session_id
+                        st.rerun()
+                else:
+                    # Second click: Confirm delete
+                    if st.button("⚠️ Confirm", key="confirm_delete", type="secondary"):
                         try:
-                            session_id = session_options[selected]
-                            from session_manager import SessionManager
-                            st.session_state.session_manager = SessionManager.load(session_id)
-                            st.session_state.current_session_id = session_id
-                            st.success(f"✅ Loaded successfully!")
-                            st.session_state.needs_rerun = True
+                            SessionManager.delete_session(session_id)
+                            _session_options.clear()
+                            st.session_state.delete_confirm_id = None  # Reset confirmation
+                            st.success("🗑️ Deleted!")
+                            st.rerun()  # Refresh to update list
                         except Exception as e:
-                            st.error(f"❌ Load failed: {e}")
-                
-                with col_delete:
-                    # Initialize session state for delete confirmation
-                    if 'delete_confirm_id' not in st.session_state:
-                        st.session_state.delete_confirm_id = None
-                    
-                    session_id = session_options[selected]
-                    
-                    # First click: Show confirmation state
-                    if st.session_state.delete_confirm_id != session_id:
-                        if st.button("🗑️", key="delete_btn", help="Delete selected session"):
-                            st.session_state.delete_confirm_id = session_id
-                            st.session_state.needs_rerun = True
-                    else:
-                        # Second click: Confirm delete
-                        if st.button("⚠️ Confirm", key="confirm_delete", type="secondary"):
-                            try:
-                                from session_manager import SessionManager
-                                SessionManager.delete_session(session_id)
-                                st.session_state.delete_confirm_id = None  # Reset confirmation
-                                st.success("🗑️ Deleted!")
-                                st.session_state.needs_rerun = True  # Refresh to update list
-                            except Exception as e:
-                                st.error(f"❌ Delete failed: {e}")
-                                st.session_state.delete_confirm_id = None
-            else:
-                st.caption("No saved sessions found")
+                            st.error(f"❌ Delete failed: {e}")
+                            st.session_state.delete_confirm_id = None
     else:
         st.caption("💡 No saved sessions yet. Generate content and click 'Save' to create one.")
 
@@ -405,7 +721,7 @@ with st.sidebar:
     st.divider()
 
     # ========== Character Configuration ==========
-    events = st.session_state.session_manager.event_chain.events
+    events = current_session.event_chain.events
     if len(events) == 0:
         st.sidebar.subheader("🎭 Character Configuration")
 
@@ -440,7 +756,8 @@ with st.sidebar:
             
     else:
         # AFTER FIRST GENERATION: Show locked count with reset option
-        current_count = len(st.session_state.session_manager.character_manager.get_active_characters()) + len(st.session_state.session_manager.character_manager.get_deceased_characters())
+        active_count, deceased_count, _ = current_session.character_manager.roster_stats()
+        current_count = active_count + deceased_count
         
         col1, col2 = st.sidebar.columns([3, 1])
         
@@ -455,8 +772,8 @@ with st.sidebar:
         🔒 Character count was set during the first generation.
         
         **Current roster:**
-        - {len(st.session_state.session_manager.character_manager.get_active_characters())} active
-        - {len(st.session_state.session_manager.character_manager.get_deceased_characters())} deceased
+        - {active_count} active
+        - {deceased_count} deceased
         
         Click 🔓 to reset and change character count (⚠️ clears current characters).
         """)
@@ -481,9 +798,7 @@ with st.sidebar:
 
     # Real-time validation
     if custom_input:
-        from input_validator import InputValidator
-        
-        is_valid, error_msg, warnings = InputValidator.validate(custom_input)
+        is_valid, error_msg, warnings = _validate_input(custom_input)
         
         # Show character count
         char_count = len(custom_input)
@@ -511,13 +826,10 @@ with st.sidebar:
         - Continuity style
         - Transition smoothness
         """)
-        
-        from config import Config
-        
-        persona_options = list(Config.PERSONA_PRESETS.keys())
+
         selected_persona = st.selectbox(
             "Choose narrative style:",
-            options=persona_options,
+            options=Config.PERSONA_OPTIONS,
             index=0,  # Default to "Smooth Storyteller"
             key="persona_select"
         )
@@ -569,12 +881,7 @@ with st.sidebar:
         """)
     
     # Show estimated word count
-    time_span_estimates = {
-        'brief': '500-700',
-        'moderate': '650-900',
-        'epic': '800-1000'
-    }
-    st.caption(f"📊 Estimated: {time_span_estimates[time_span_value]} words")
+    st.caption(f"📊 Estimated: {_TIME_SPAN_ESTIMATES[time_span_value]} words")
     
     st.markdown("")  # Spacing
     
@@ -612,12 +919,7 @@ with st.sidebar:
         """)
     
     # Show event count estimate
-    event_counts = {
-        'sparse': '3-5 events',
-        'moderate': '5-8 events',
-        'rich': '8-12 events'
-    }
-    st.caption(f"📈 Expected: {event_counts[event_density_value]}")
+    st.caption(f"📈 Expected: {_EVENT_COUNTS[event_density_value]}")
     
     st.markdown("")  # Spacing
     
@@ -652,14 +954,7 @@ with st.sidebar:
   - Focus on human stories and lineages
         """)
     
-    focus_icons = {
-        'political': '🏛️',
-        'cultural': '🎨',
-        'military': '⚔️',
-        'economic': '💰',
-        'personal': '👥'
-    }
-    st.caption(f"{focus_icons[narrative_focus_value]} Focus: {narrative_focus_value.capitalize()}")
+    st.caption(f"{_FOCUS_ICONS[narrative_focus_value]} Focus: {narrative_focus_value.capitalize()}")
     
     st.markdown("")  # Spacing
     
@@ -699,23 +994,8 @@ with st.sidebar:
     # === PARAMETER VALIDATION SUMMARY ===
     st.markdown("### 📋 Generation Preview")
     
-    # Calculate estimated metrics
-    time_multiplier = {'brief': 0.7, 'moderate': 0.85, 'epic': 1.0}
-    density_multiplier = {'sparse': 0.8, 'moderate': 1.0, 'rich': 1.2}
-    
-    base_word_estimate = 750  # Middle of 500-1000 range
-    estimated_words = int(
-        base_word_estimate * 
-        time_multiplier[time_span_value] * 
-        density_multiplier[event_density_value]
-    )
-    
-    # Clamp to valid range
-    estimated_words = max(500, min(1000, estimated_words))
-    
-    # Calculate estimated events
-    event_base = {'sparse': 4, 'moderate': 6, 'rich': 10}
-    estimated_events = event_base[event_density_value]
+    # Estimated metrics (precomputed per time span / density pair)
+    estimated_words, estimated_events = _ESTIMATES[(time_span_value, event_density_value)]
     
     # Display metrics in columns
     metric_col1, metric_col2, metric_col3 = st.columns(3)
@@ -764,7 +1044,7 @@ with col1:
     if generate_button:
         # validation check
         if custom_input:
-            is_valid, error_msg, warnings = InputValidator.validate(custom_input)
+            is_valid, error_msg, warnings = _validate_input(custom_input)
             
             if not is_valid:
                 st.error(f"❌ {error_msg}")
@@ -823,66 +1103,25 @@ with col1:
             content = result.get('content', '')
             word_count = result.get('word_count', 0)
             
+            # Reused output from the response cache (exact prompt or similar request)
+            if result.get('cache'):
+                st.caption(f"♻️ Cached result ({result['cache']} match), no new API call was made")
+
             # Display the generated chronology
             st.markdown(content)
-            
-            # === EXPORT OPTIONS ===
-            st.markdown("---")
-            st.markdown("### 💾 Export Options")
-            
-            export_col1, export_col2, export_col3 = st.columns(3)
-            
-            with export_col1:
-                st.download_button(
-                    label="📄 Download TXT",
-                    data=content,
-                    file_name=f"{result.get('theme', 'chronology')}_{result.get('timestamp', '')}.txt",
-                    mime="text/plain"
-                )
-            
-            with export_col2:
-                import json
-                json_data = json.dumps(result, indent=2)
-                st.download_button(
-                    label="📊 Download JSON",
-                    data=json_data,
-                    file_name=f"{result.get('theme', 'chronology')}_{result.get('timestamp', '')}.json",
-                    mime="application/json"
-                )
-            
-            with export_col3:
-                if st.button("💾 Save to Output Folder"):
-                    try:
-                        import os
-                        from datetime import datetime
-                        
-                        # Create output directory if it doesn't exist
-                        os.makedirs('output', exist_ok=True)
-                        
-                        # Generate filename
-                        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                        theme_clean = result.get('theme', 'chronology').replace(' ', '_')
-                        filename = f"output/{theme_clean}_{timestamp}.txt"
-                        
-                        # Save file
-                        with open(filename, 'w', encoding='utf-8') as f:
-                            f.write(content)
-                            f.write("\n\n" + "="*60 + "\n")
-                            f.write("METADATA\n")
-                            f.write("="*60 + "\n")
-                            f.write(json.dumps(result, indent=2))
-                        
-                        st.success(f"✅ Saved to: {filename}")
-                    except Exception as e:
-                        st.error(f"❌ Error saving file: {e}")
+
+            # Export buttons rerun on their own, without re-running the page
+            _export_panel(result)
 
 with col2:
     # CHARACTER ROSTER DISPLAY ===
     st.header("👥 Character Roster")
 
-    active_chars = st.session_state.session_manager.character_manager.get_active_characters()
-    deceased_chars = st.session_state.session_manager.character_manager.get_deceased_characters()
-    revived_chars = st.session_state.session_manager.character_manager.get_revived_characters()
+    # Partitions are cached on the manager, display strings in session state,
+    # both until the next roster change
+    character_manager = st.session_state.session_manager.character_manager
+    active_chars, deceased_chars, revived_chars = character_manager.partition_roster()
+    active_rows, deceased_entries, revival_entries = _roster_display(character_manager)
 
     # === CHARACTER COUNT VALIDATION ===
     if active_chars or deceased_chars:
@@ -911,45 +1150,14 @@ with col2:
                 st.error(f"❌ {actual_count - target_count} extra")
 
     # === ACTIVE CHARACTERS ===
+    # Rows come precomputed from _roster_display(); each keeps its own st.caption,
+    # since markdown has no caption style and raw HTML stays off for model output
     if active_chars:
         st.markdown("**Active Characters:**")
-        for char in sorted(active_chars, key=lambda c: c.role):
-            # Role-based emoji
-            role_emoji = {
-                'main': '⭐',
-                'supporting': '✅', 
-                'minor': '○'
-            }.get(char.role, '✅')
-            
-            # Build display string
-            display = f"{role_emoji} **{char.name}** ({char.role})"
-            
-            # 🆕 ADD REVIVAL INDICATOR
-            if char.revival_event:
-                display += f" ✨"  # Sparkle indicates revival
-            
-            # Add first appearance
-            display += f" • Introduced: Event {char.first_appearance}"
-            
-            # 🆕 ADD REVIVAL INFO
-            if char.revival_event:
-                display += f" • Revived: Event {char.revival_event}"
-            
-            # Add action count
-            if char.notable_actions:
-                display += f" • {len(char.notable_actions)} actions"
-            
-            st.markdown(display)
-            
-            # Show latest action in small text
-            if char.notable_actions:
-                latest_action = char.notable_actions[-1]
-                
-                # 🆕 HIGHLIGHT REVIVAL IN LATEST ACTION
-                if "Revived:" in latest_action:
-                    st.caption(f"✨ {latest_action}")
-                else:
-                    st.caption(f"Latest: {latest_action}")
+        for line, caption in active_rows:
+            st.markdown(line)
+            if caption:
+                st.caption(caption)
     else:
         st.caption("No characters yet")
 
@@ -957,95 +1165,18 @@ with col2:
     if deceased_chars:
         st.markdown("")  # Spacer
         with st.expander(f"⚰️ Deceased Characters ({len(deceased_chars)})", expanded=False):
-            for char in deceased_chars:
-                death_event = char.death_event if char.death_event else "Unknown"
-                
-                st.markdown(f"💀 **{char.name}** ({char.role})")
-                st.caption(f"└─ Died in Event {death_event}")
-                
-                # Show death cause if available
-                if char.notable_actions:
-                    # Find the death action
-                    death_action = None
-                    for action in char.notable_actions:
-                        if "Died:" in action:
-                            death_action = action
-                            break
-                    
-                    if death_action:
-                        cause = death_action.replace("Died:", "").strip()
-                        st.caption(f"└─ Cause: {cause}")
-                
-                st.markdown("")  # Spacer between characters
+            _render_entries(deceased_entries)
 
     # === REVIVAL HISTORY SECTION ===
     if revived_chars:
         st.markdown("")  # Spacer
         with st.expander(f"✨ Characters with Revival History ({len(revived_chars)})", expanded=False):
-            for char in revived_chars:
-                # Determine current status
-                status_emoji = "✅" if char.status == "alive" else "💀"
-                status_text = char.status.upper()
-                
-                st.markdown(f"🔄 **{char.name}** ({char.role}) - {status_emoji} {status_text}")
-                
-                # Death info
-                if char.death_event:
-                    st.caption(f"├─ 💀 Died: Event {char.death_event}")
-                    
-                    # Find death cause
-                    death_action = None
-                    for action in char.notable_actions:
-                        if "Died:" in action:
-                            death_action = action.replace("Died:", "").strip()
-                            break
-                    
-                    if death_action:
-                        # Truncate if too long
-                        death_display = death_action[:80] + "..." if len(death_action) > 80 else death_action
-                        st.caption(f"│  └─ {death_display}")
-                
-                # Revival info
-                if char.revival_event:
-                    st.caption(f"├─ ✨ Revived: Event {char.revival_event}")
-                    
-                    # Find revival reason
-                    revival_reason = None
-                    for action in char.notable_actions:
-                        if "Revived:" in action:
-                            revival_reason = action.replace("Revived:", "").strip()
-                            break
-                    
-                    if revival_reason:
-                        # Clean up the reason display
-                        if " - " in revival_reason:
-                            # Format: "via magic - context..."
-                            parts = revival_reason.split(" - ", 1)
-                            mechanism = parts
-                            context = parts if len(parts) > 1 else ""
-                            
-                            st.caption(f"│  ├─ Method: {mechanism}")
-                            if context:
-                                context_display = context[:100] + "..." if len(context) > 100 else context
-                                st.caption(f"│  └─ {context_display}")
-                        else:
-                            # Simple reason
-                            reason_display = revival_reason[:100] + "..." if len(revival_reason) > 100 else revival_reason
-                            st.caption(f"│  └─ {reason_display}")
-                
-                # Calculate lifecycle stats
-                death_count = len([a for a in char.notable_actions if "Died:" in a])
-                revival_count = len([a for a in char.notable_actions if "Revived:" in a])
-                
-                if death_count > 1 or revival_count > 1:
-                    st.caption(f"└─ 📊 Deaths: {death_count} | Revivals: {revival_count}")
-                
-                st.markdown("")  # Spacer between characters
+            _render_entries(revival_entries)
 
     # === LIFECYCLE STATISTICS ===
     if active_chars or deceased_chars:
         total_chars = len(active_chars) + len(deceased_chars)
-        total_deaths = len(deceased_chars) + len([c for c in active_chars if c.death_event])
+        total_deaths = len(deceased_chars) + sum(1 for c in active_chars if c.death_event)
         total_revivals = len(revived_chars)
         
         if total_deaths > 0 or total_revivals > 0:
@@ -1075,9 +1206,18 @@ with col2:
             events = st.session_state.session_manager.event_chain.events
             if events:
                 st.caption(f"Total events in chain: {len(events)}")
+
+                # Long chains render only the latest events unless asked for all
+                first_shown = 0
+                if len(events) > _EVENT_CHAIN_WINDOW:
+                    if not st.checkbox(f"Show all {len(events)} events", key="show_all_events"):
+                        first_shown = len(events) - _EVENT_CHAIN_WINDOW
+                        st.caption(f"Showing the latest {_EVENT_CHAIN_WINDOW} events")
+                last_index = len(events) - 1
                 
                 # Create timeline visualization
-                for i, event in enumerate(events):
+                for i in range(first_shown, len(events)):
+                    event = events[i]
                     with st.expander(f"**Event {event.event_number}**"):
    
                         # Event summary
@@ -1085,14 +1225,14 @@ with col2:
                         
                         # Characters involved
                         if event.affected_characters:
-                            char_tags = ' '.join([f"`{c}`" for c in event.affected_characters[:3]])
+                            char_tags = ' '.join(f"`{c}`" for c in event.affected_characters[:3])
                             st.markdown(f"👥 {char_tags}")
                         
                         # Hook to next event
-                        if event.hook and i < len(events) - 1:
+                        if event.hook and i < last_index:
                             st.markdown(f"→ *{event.hook}*")
                     
-                    if i < len(events) - 1:
+                    if i < last_index:
                         st.markdown("---")
             else:
                 st.caption("No events in chain yet")
@@ -1108,27 +1248,11 @@ with col2:
             metric_col1, metric_col2, metric_col3 = st.columns(3)
             
             with metric_col1:
-                # Word count with color coding
-                if 500 <= word_count <= 1000:
-                    status_icon = "✅"
-                    status_text = "Within target"
-                    status_color = "green"
-                    percentage = int((word_count / 1000) * 100)
-                elif 1000 < word_count <= 1200:
-                    status_icon = "⚠️"
-                    status_text = "Slightly over"
-                    status_color = "orange"
-                    percentage = int((word_count / 1000) * 100)
-                elif word_count > 1200:
-                    status_icon = "❌"
-                    status_text = "Significantly over"
-                    status_color = "red"
-                    percentage = 120
-                else:  # word_count < 500
-                    status_icon = "⚠️"
-                    status_text = "Under target"
-                    status_color = "orange"
-                    percentage = int((word_count / 1000) * 100)
+                # Word count with color coding (percentage of the 1,000-word max, capped at 120)
+                status_icon, status_text, status_color = _WORD_COUNT_STATUS[
+                    bisect_right(_WORD_COUNT_THRESHOLDS, word_count)
+                ]
+                percentage = min(word_count // 10, 120)
                 
                 st.metric(
                     label="Word Count",
@@ -1159,9 +1283,10 @@ with col2:
             with metric_col3:
                 model_name = result.get('model', 'Unknown')
                 # Extract short model name
-                if 'gemini-2.0' in model_name.lower():
+                model_lower = model_name.lower()
+                if 'gemini-2.0' in model_lower:
                     display_name = "Gemini 2.0"
-                elif 'gemini-1.5' in model_name.lower():
+                elif 'gemini-1.5' in model_lower:
                     display_name = "Gemini 1.5"
                 else:
                     display_name = "Gemini"
@@ -1224,13 +1349,7 @@ with col2:
                         if stages_data.get('stage1_preview'):
                             st.markdown("---")
                             st.markdown("##### 📄 Stage 1 Preview (Initial Skeleton)")
-                            st.text_area(
-                                label="Initial skeleton content",
-                                value=stages_data['stage1_preview'],
-                                height=150,
-                                disabled=True,
-                                label_visibility="collapsed"
-                            )
+                            st.text(stages_data['stage1_preview'])
                         # Explain the process
                         st.markdown("---")
                         st.info(
@@ -1260,14 +1379,12 @@ with col2:
     # === GENERATION HISTORY ===
     st.subheader("📜 Generation History")
     if st.session_state.generation_history:
-        for i, item in enumerate(reversed(st.session_state.generation_history[-5:]), 1):
+        for i, item in enumerate(reversed(st.session_state.generation_history), 1):
             st.caption(f"{i}. {item['timestamp']} - {item['theme']} ({item['word_count']} words)")
     else:
         st.caption("No generations yet")
 
-if st.session_state.needs_rerun:
-    st.session_state.needs_rerun = False
-    st.rerun()
+
 
 # Footer
 st.divider()
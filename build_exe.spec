@@ -43,6 +43,8 @@ a = Analysis(
             ('character_manager.py', '.'),     # Character manager
             ('input_validator.py', '.'),     # Input validator
             ('causal_chain.py', '.'),     # casual chain
+            ('response_cache.py', '.'),     # Response cache
+            ('rate_limiter.py', '.'),     # Rate limiter
             ('app.py', '.'),                # Main Streamlit application (critical!)
         ]
     ),
@@ -68,11 +68,29 @@ class CausalEventChain:
         self.events: List[EventNode] = []
         self.open_threads: List[str] = []  # Unresolved plot points
         self.current_tone = "neutral"  # Track emotional progression
+        self.version = 0  # Bumped whenever events or threads change
+        self._prompt_cache = None  # (key, prompt)
+
+    def _touch(self):
+        """Record a chain mutation so cached prompts are rebuilt"""
+        self.version += 1
+
+    def snapshot(self):
+        """Capture the chain so a discarded generation can be rolled back with restore()"""
+        return list(self.events), list(self.open_threads), self.current_tone
+
+    def restore(self, snapshot):
+        """Roll the chain back to a snapshot() taken earlier"""
+        events, open_threads, self.current_tone = snapshot
+        self.events = list(events)
+        self.open_threads = list(open_threads)
+        self._touch()
     
     def add_event(self, event_number: int, content: str) -> EventNode:
         """Add a new event to the chain"""
         node = EventNode(event_number, content)
         self.events.append(node)
+        self._touch()
         return node
     
     def get_last_event(self) -> Optional[EventNode]:
@@ -127,16 +145,19 @@ class CausalEventChain:
         """Add an unresolved plot point"""
         if thread and thread not in self.open_threads:
             self.open_threads.append(thread)
+            self._touch()
     
     def resolve_thread(self, thread: str):
         """Mark a plot thread as resolved"""
         if thread in self.open_threads:
             self.open_threads.remove(thread)
+            self._touch()
     
     def clear_stale_threads(self, max_threads: int = 5):
         """Keep only the most recent threads to avoid clutter"""
         if len(self.open_threads) > max_threads:
             self.open_threads = self.open_threads[-max_threads:]
+            self._touch()
     
     def extract_summary_from_event(self, content: str) -> str:
         """
@@ -778,12 +799,20 @@ class CausalEventChain:
 
         # Clean up old threads
         self.clear_stale_threads(max_threads=5)
+
+        # Summary/hook/affected characters on the node feed the causal prompt
+        self._touch()
     
     def build_causal_prompt(self, next_event_number: int, character_roster: str = "") -> str:
         """
         Build a complete prompt that enforces narrative flow
         ENHANCED with smooth transitions and emotional beats
         """
+        # Reuse the last prompt while the chain and inputs are unchanged
+        cache_key = (self.version, next_event_number, character_roster)
+        if self._prompt_cache and self._prompt_cache[0] == cache_key:
+            return self._prompt_cache[1]
+
         prompt = f"""You are generating Event {next_event_number} in a chronological narrative.
 
     CRITICAL NARRATIVE FLOW REQUIREMENTS:
@@ -857,6 +886,7 @@ class CausalEventChain:
     Generate Event {next_event_number} now with smooth, natural narrative flow.
     """
         
+        self._prompt_cache = (cache_key, prompt)
         return prompt
 
     
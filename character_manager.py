@@ -2,11 +2,42 @@
 import json
 import re
 from datetime import datetime
+from operator import attrgetter
 from typing import Dict, List, Optional, Set
 
 
+# Role heuristics: titles and action verbs near a character's mentions
+_ROLE_TITLES = (
+    'king', 'queen', 'emperor', 'empress', 'prince', 'princess',
+    'lord', 'lady', 'sir', 'dame', 'general', 'commander'
+)
+
+# High-importance action verbs (indicates MAIN character)
+_MAIN_ACTION_PATTERNS = [re.compile(p) for p in (
+    r'\b(ruled|reigned|conquered|founded|established|created)\b',
+    r'\b(declared|proclaimed|decreed|ordered|commanded)\b',
+    r'\b(killed|assassinated|defeated|destroyed)\b',
+    r'\b(led|guided|united|liberated|saved)\b',
+)]
+
+# Medium-importance action verbs (indicates SUPPORTING character)
+_SUPPORTING_ACTION_PATTERNS = [re.compile(p) for p in (
+    r'\b(fought|defended|attacked|battled|served)\b',
+    r'\b(discovered|found|uncovered|revealed)\b',
+    r'\b(married|allied|betrayed|fled|escaped)\b',
+    r'\b(built|constructed|forged|crafted)\b',
+)]
+
+
 class CharacterState:
     """Represents the state of a single character"""
+
+    # Fixed attribute layout: smaller instances and faster attribute reads on large rosters
+    __slots__ = (
+        'name', 'status', 'role', 'first_appearance', 'last_mentioned',
+        'death_event', 'revival_event', 'death_count', 'revival_count',
+        'relationships', 'notable_actions'
+    )
     
     def __init__(self, name: str, role: str = "supporting", event_introduced: int = 1):
         self.name = name
@@ -41,9 +72,39 @@ class CharacterState:
     def add_action(self, action: str, event_num: int):
         """Record a notable action"""
         self.notable_actions.append(f"{action} (Event {event_num})")
+
+    def copy(self) -> 'CharacterState':
+        """Independent copy, including the mutable relationships and notable_actions"""
+        clone = CharacterState.__new__(CharacterState)
+        for slot in self.__slots__:
+            setattr(clone, slot, getattr(self, slot))
+        clone.relationships = dict(self.relationships)
+        clone.notable_actions = list(self.notable_actions)
+        return clone
+
+    def lifecycle(self) -> tuple[Optional[str], Optional[str], int, int]:
+        """
+        Parse notable_actions in one pass
+
+        Returns:
+            (first death cause, first revival reason, death count, revival count)
+        """
+        death_cause = revival_reason = None
+        death_count = revival_count = 0
+        for action in self.notable_actions:
+            if action.startswith("Died:"):
+                death_count += 1
+                if death_cause is None:
+                    death_cause = action[5:].strip()
+            elif action.startswith("Revived:"):
+                revival_count += 1
+                if revival_reason is None:
+                    revival_reason = action[8:].strip()
+        return death_cause, revival_reason, death_count, revival_count
     
     def to_dict(self):
         """Convert to dictionary for JSON serialization"""
+        _, _, death_count, revival_count = self.lifecycle()
         return {
             'name': self.name,
             'status': self.status,
@@ -52,8 +113,8 @@ class CharacterState:
             'last_mentioned': self.last_mentioned,
             'death_event': self.death_event,
             'revival_event': self.revival_event,
-            'death_count': len([a for a in self.notable_actions if 'Died:' in a]),
-            'revival_count': len([a for a in self.notable_actions if 'Revived:' in a]),
+            'death_count': death_count,
+            'revival_count': revival_count,
             'relationships': self.relationships,
             'notable_actions': self.notable_actions
         }
@@ -80,6 +141,31 @@ class CharacterManager:
         self.roster: Dict[str, CharacterState] = {}  # {name: CharacterState}
         self.current_event_num = 0
         self.name_variations = {}  # Handle "King Alaric" vs "Alaric"
+        self.version = 0  # Bumped on every roster mutation made through this manager
+        self._summary_cache = None  # (version, summary)
+        self._partition_cache = None  # (version, (active, deceased, revived))
+
+    def _touch(self):
+        """Record a roster mutation so cached summaries are rebuilt"""
+        self.version += 1
+
+    def snapshot(self):
+        """Capture the roster so a discarded generation can be rolled back with restore()"""
+        return self._copy_roster(self.roster, self.name_variations)
+
+    def restore(self, snapshot):
+        """Roll the roster back to a snapshot() taken earlier"""
+        # Copied again so the snapshot stays intact for a further restore()
+        self.roster, self.name_variations = self._copy_roster(*snapshot)
+        self._touch()
+
+    @staticmethod
+    def _copy_roster(roster, name_variations):
+        """Copy the roster deeply enough that kills, revivals and actions don't leak across"""
+        return (
+            {name: char.copy() for name, char in roster.items()},
+            {name: list(variants) for name, variants in name_variations.items()}
+        )
     
     def determine_character_role(self, char_name: str, text: str) -> str:
         """
@@ -91,59 +177,34 @@ class CharacterManager:
         - Title presence
         - Possessive usage
         """
-        import re
-        
-        text_lower = text.lower()
+        return self._classify_role(char_name, text.lower())
+
+    def _classify_role(self, char_name: str, text_lower: str) -> str:
+        """Role heuristics for determine_character_role over pre-lowercased text"""
         char_lower = char_name.lower()
         
-        # Count mentions (case-insensitive word boundary)
+        # Find mentions once (case-insensitive word boundary); counts and
+        # action-verb contexts below all reuse these positions
         mention_pattern = r'\b' + re.escape(char_lower) + r'\b'
-        mention_count = len(re.findall(mention_pattern, text_lower))
+        mention_positions = [m.start() for m in re.finditer(mention_pattern, text_lower)]
+        mention_count = len(mention_positions)
         
         # Check for title usage (e.g., "Queen Lyra", "King Aldric")
-        has_title = any(title in char_name.lower() for title in [
-            'king', 'queen', 'emperor', 'empress', 'prince', 'princess',
-            'lord', 'lady', 'sir', 'dame', 'general', 'commander'
-        ])
+        has_title = any(title in char_lower for title in _ROLE_TITLES)
         
         # Check for possessive usage (indicates importance)
         has_possessive = f"{char_lower}'s" in text_lower
         
-        # High-importance action verbs (indicates MAIN character)
-        main_actions = [
-            r'\b(ruled|reigned|conquered|founded|established|created)\b',
-            r'\b(declared|proclaimed|decreed|ordered|commanded)\b',
-            r'\b(killed|assassinated|defeated|destroyed)\b',
-            r'\b(led|guided|united|liberated|saved)\b',
-        ]
-        
-        # Medium-importance action verbs (indicates SUPPORTING character)
-        supporting_actions = [
-            r'\b(fought|defended|attacked|battled|served)\b',
-            r'\b(discovered|found|uncovered|revealed)\b',
-            r'\b(married|allied|betrayed|fled|escaped)\b',
-            r'\b(built|constructed|forged|crafted)\b',
-        ]
+        # Text 50 chars before and after each mention
+        contexts = [text_lower[max(0, pos - 50):pos + 50] for pos in mention_positions]
         
-        # Count actions near character name
-        main_action_count = 0
-        supporting_action_count = 0
-        
-        # Search for character name followed by action within 50 characters
-        for pattern in main_actions:
-            for char_match in re.finditer(mention_pattern, text_lower):
-                char_pos = char_match.start()
-                # Look 50 chars before and after
-                context = text_lower[max(0, char_pos-50):min(len(text_lower), char_pos+50)]
-                if re.search(pattern, context):
-                    main_action_count += 1
-        
-        for pattern in supporting_actions:
-            for char_match in re.finditer(mention_pattern, text_lower):
-                char_pos = char_match.start()
-                context = text_lower[max(0, char_pos-50):min(len(text_lower), char_pos+50)]
-                if re.search(pattern, context):
-                    supporting_action_count += 1
+        # Count actions near character name (one hit per pattern per mention)
+        main_action_count = sum(
+            1 for pattern in _MAIN_ACTION_PATTERNS for context in contexts if pattern.search(context)
+        )
+        supporting_action_count = sum(
+            1 for pattern in _SUPPORTING_ACTION_PATTERNS for context in contexts if pattern.search(context)
+        )
         
         # === CLASSIFICATION LOGIC ===
         
@@ -185,6 +246,7 @@ class CharacterManager:
         
         # Track name variations (e.g., "King Alaric" and "Alaric")
         self.name_variations[normalized_name] = [name]
+        self._touch()
         
         return char
     
@@ -198,6 +260,7 @@ class CharacterManager:
         char = self.get_character(name)
         if char:
             char.kill(self.current_event_num, cause)
+            self._touch()
             return True
         return False
     
@@ -228,6 +291,7 @@ class CharacterManager:
         
         # Perform revival
         char.revive(self.current_event_num, reason)
+        self._touch()
         
         # Log the revival
         print(f"✅ Revival successful: {name}")
@@ -285,6 +349,40 @@ class CharacterManager:
         """Get all dead characters"""
         return [char for char in self.roster.values() if char.status == "dead"]
     
+    def partition_roster(self) -> tuple[List[CharacterState], List[CharacterState], List[CharacterState]]:
+        """
+        Return (active, deceased, revived) characters from a single roster pass
+
+        Active characters are ordered by role for display. The lists are reused
+        until the roster changes, so callers must not modify them.
+        """
+        if self._partition_cache and self._partition_cache[0] == self.version:
+            return self._partition_cache[1]
+
+        active, deceased, revived = [], [], []
+        for char in self.roster.values():
+            if char.status == "alive":
+                active.append(char)
+            elif char.status == "dead":
+                deceased.append(char)
+            if char.revival_event is not None:
+                revived.append(char)
+
+        active.sort(key=attrgetter('role'))
+        partitions = (active, deceased, revived)
+        self._partition_cache = (self.version, partitions)
+        return partitions
+
+    def roster_stats(self) -> tuple[int, int, int]:
+        """Return (active_count, deceased_count, total) from a single roster pass"""
+        active = deceased = 0
+        for char in self.roster.values():
+            if char.status == "alive":
+                active += 1
+            elif char.status == "dead":
+                deceased += 1
+        return active, deceased, len(self.roster)
+    
     def is_character_alive(self, name: str) -> bool:
         """Check if character is alive"""
         char = self.get_character(name)
@@ -680,13 +778,18 @@ class CharacterManager:
         Returns: (is_valid, list_of_violations)
         """
         deceased = self.get_deceased_characters()
+        if not deceased:
+            # Nobody has died yet: nothing to look for in the text
+            return True, []
+
         violations = []
         
         for char in deceased:
-            # Check all name variations
+            # Check all name variations; one hit is enough to flag the character
             for name_var in self.name_variations.get(self._normalize_name(char.name), [char.name]):
                 if name_var in text:
                     violations.append(f"{char.name} (died in Event {char.death_event})")
+                    break
         
         return len(violations) == 0, violations
     
@@ -770,6 +873,16 @@ class CharacterManager:
 
     def get_roster_summary(self) -> str:
         """Get formatted summary of character roster for AI prompt"""
+        # Reuse the last summary while the roster is unchanged
+        if self._summary_cache and self._summary_cache[0] == self.version:
+            return self._summary_cache[1]
+
+        summary = self._build_roster_summary()
+        self._summary_cache = (self.version, summary)
+        return summary
+
+    def _build_roster_summary(self) -> str:
+        """Format the roster summary (uncached)"""
         active = self.get_active_characters()
         deceased = self.get_deceased_characters()
 
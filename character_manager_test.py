@@ -24,6 +24,7 @@ def test_character_manager():
     
     print("Active characters:", [c.name for c in manager.get_active_characters()])
     print("Deceased:", [c.name for c in manager.get_deceased_characters()])
+    assert manager.roster_stats() == (2, 1, 3)
     print()
     
     # Test validation
@@ -42,7 +43,62 @@ def test_character_manager():
     
     # Get roster summary
     print("4. Roster Summary for AI:")
-    print(manager.get_roster_summary())
+    summary = manager.get_roster_summary()
+    print(summary)
+
+    # Summary is reused until the roster changes
+    print("5. Summary caching...")
+    assert manager.get_roster_summary() is summary
+    manager.revive_character("King Alaric", reason="Returned through ancient magic")
+    refreshed = manager.get_roster_summary()
+    assert refreshed is not summary
+    assert "Revived:" in refreshed
+    print("Summary rebuilt after revival")
+
+    # Snapshot/restore rolls back characters added by a discarded attempt
+    print("6. Snapshot and restore...")
+    snapshot = manager.snapshot()
+    manager.add_character("Sir Cedric", role="supporting", event_num=4)
+    assert manager.get_character("Sir Cedric")
+    manager.restore(snapshot)
+    assert not manager.get_character("Sir Cedric")
+    assert "Sir Cedric" not in manager.get_roster_summary()
+    # Lifecycle changes to existing characters are rolled back too
+    manager.kill_character("Queen Lyra", cause="Poisoned at the feast")
+    assert manager.get_character("Queen Lyra").status == "dead"
+    manager.restore(snapshot)
+    lyra = manager.get_character("Queen Lyra")
+    assert lyra.status == "alive"
+    assert not any(action.startswith("Died:") for action in lyra.notable_actions)
+    print("Roster:", sorted(manager.roster))
+    print()
+
+    # Partitions are reused until the roster changes
+    print("7. Roster partitions...")
+    active, deceased, revived = manager.partition_roster()
+    assert [c.name for c in revived] == ["King Alaric"]
+    assert len(active) == 3 and not deceased
+    assert manager.partition_roster()[0] is active
+    manager.kill_character("Queen Lyra", cause="Fell in battle")
+    active, deceased, _ = manager.partition_roster()
+    assert [c.name for c in deceased] == ["Queen Lyra"]
+    assert [c.role for c in active] == sorted(c.role for c in active)
+    assert len(active) == 2
+    print("Partitions rebuilt after death")
+    print()
+
+    # Lifecycle parsing reads causes and counts in one pass
+    print("8. Lifecycle parsing...")
+    alaric = manager.get_character("King Alaric")
+    assert alaric.lifecycle() == (
+        "Assassinated by The Assassin (Event 3)",
+        "Returned through ancient magic (Event 3)",
+        1,
+        1,
+    )
+    assert alaric.to_dict()['death_count'] == 1
+    assert not hasattr(alaric, '__dict__')  # __slots__ layout
+    print("Lifecycle:", alaric.lifecycle())
 
 if __name__ == "__main__":
     test_character_manager()
@@ -12,7 +12,27 @@ class Config:
     MIN_WORDS = 500
     MAX_WORDS = 1000
 
-    THEMES = [
+    # How long the list_models() result is reused before refreshing (seconds)
+    MODEL_LIST_CACHE_TTL = int(os.getenv('MODEL_LIST_CACHE_TTL', 3600))
+    # Where the resolved model name and cached responses are kept between runs
+    CACHE_DIR = os.getenv('CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'histfic'))
+
+    # Batch generation: parallel workers and client-side request pacing
+    MAX_CONCURRENCY = int(os.getenv('MAX_CONCURRENCY', 4))
+    REQUESTS_PER_MINUTE = int(os.getenv('REQUESTS_PER_MINUTE', 60))
+
+    # Response cache: only outputs generated at or below this temperature are reused
+    RESPONSE_CACHE_TTL = int(os.getenv('RESPONSE_CACHE_TTL', 86400))
+    RESPONSE_CACHE_MAX_TEMPERATURE = float(os.getenv('RESPONSE_CACHE_MAX_TEMPERATURE', 0.0))
+    # SQLite file that keeps cached responses across runs (empty = memory only, the default)
+    CACHE_DB_PATH = os.getenv('CACHE_DB_PATH', '')
+
+    # Semantic cache: reuse outputs for near-duplicate theme/custom input (opt-in)
+    SEMANTIC_CACHE_ENABLED = os.getenv('SEMANTIC_CACHE_ENABLED', 'false').lower() == 'true'
+    SEMANTIC_CACHE_THRESHOLD = float(os.getenv('SEMANTIC_CACHE_THRESHOLD', 0.9))
+    EMBEDDING_MODEL = os.getenv('EMBEDDING_MODEL', 'models/text-embedding-004')
+
+    THEMES = (
         "Fantasy Kingdom",
         "Future prophecy",
         "Survivors of an apocalyptic event",
@@ -23,7 +43,7 @@ class Config:
         "Reimagined Singapore",
         "Alien planet",
         "Interesting object (work of art, enchanted artifact, spaceship)"
-    ]
+    )
     
     # NEW: Parameter-driven content variation
     TIME_SPANS = {
@@ -117,6 +137,9 @@ class Config:
         }
     }
 
+    # Selectbox options, built once instead of on every Streamlit rerun
+    PERSONA_OPTIONS = tuple(PERSONA_PRESETS)
+
     DEFAULT_PERSONA = "Smooth Storyteller"
     
     @staticmethod
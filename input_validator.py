@@ -38,6 +38,7 @@ class InputValidator:
         r'(.)\1{20,}',  # Same character 20+ times
         r'(\w+)\s+\1\s+\1\s+\1',  # Same word 4+ times in row
     ]
+    _FORBIDDEN_RES = [re.compile(pattern, re.IGNORECASE) for pattern in FORBIDDEN_PATTERNS]
     
     # Warning patterns (allowed but flagged)
     WARNING_PATTERNS = [
@@ -46,6 +47,9 @@ class InputValidator:
         (r'[!?]{5,}', "Contains excessive punctuation"),
         (r'https?://\S+', "Contains URLs (may not be processed)"),
     ]
+    _WARNING_RES = [(re.compile(pattern), message) for pattern, message in WARNING_PATTERNS]
+
+    _SPECIAL_CHAR_RE = re.compile(r'[^a-zA-Z0-9\s]')
     
     @classmethod
     def validate(cls, text: str) -> Tuple[bool, str, List[str]]:
@@ -73,17 +77,17 @@ class InputValidator:
         
         # 3. Check for forbidden patterns
         text_lower = text.lower()
-        for pattern in cls.FORBIDDEN_PATTERNS:
-            if re.search(pattern, text_lower, re.IGNORECASE):
+        for pattern in cls._FORBIDDEN_RES:
+            if pattern.search(text_lower):
                 return False, "Input contains forbidden content or potential security risk", []
         
         # 4. Check for warning patterns
-        for pattern, warning_msg in cls.WARNING_PATTERNS:
-            if re.search(pattern, text):
+        for pattern, warning_msg in cls._WARNING_RES:
+            if pattern.search(text):
                 warnings.append(warning_msg)
         
         # 5. Check for excessive special characters (>30% of content)
-        special_chars = len(re.findall(r'[^a-zA-Z0-9\s]', text))
+        special_chars = len(cls._SPECIAL_CHAR_RE.findall(text))
         if special_chars / char_count > 0.3:
             warnings.append("High density of special characters detected")
         
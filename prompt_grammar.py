@@ -2,11 +2,34 @@
 Grammar-based prompt system with explicit variable slots
 Implements replacement grammar concept from Caves of Qud
 """
+import functools
 
 class PromptGrammar:
     """Structured prompt grammar with replaceable components"""
     
-    BASE_STRUCTURE = """You are an expert historical fiction writer specializing in creating detailed, believable chronologies.
+    # Static instructions come first and never change between calls, so the
+    # provider can reuse its prefix cache; everything variable follows.
+    STATIC_PREFIX = """You are an expert historical fiction writer specializing in creating detailed, believable chronologies.
+
+STRUCTURE REQUIREMENTS:
+1. Present events in clear chronological order with specific dates/timeframes
+2. Maintain internal consistency and logical progression
+3. Create believable cause-and-effect relationships between events
+4. Use rich, evocative language appropriate to the theme
+5. Include specific details that make the history feel authentic
+
+FORMAT GUIDELINES:
+- Start with a compelling title
+- Use clear temporal markers (years, dates, eras)
+- Write in narrative prose, not bullet points
+- Show how earlier events influence later ones
+- Create a coherent, engaging historical narrative
+
+Format your response as a narrative chronology with clear temporal markers.
+"""
+
+    BASE_STRUCTURE = STATIC_PREFIX + """
+{persona_instructions}
 
 CRITICAL WORD COUNT REQUIREMENT:
 - You MUST generate between {min_words} and {max_words} words
@@ -31,23 +54,7 @@ THEME & PARAMETERS:
 
 {causal_context}
 
-STRUCTURE REQUIREMENTS:
-1. Present events in clear chronological order with specific dates/timeframes
-2. Maintain internal consistency and logical progression
-3. Create believable cause-and-effect relationships between events
-4. Use rich, evocative language appropriate to the theme
-5. Include specific details that make the history feel authentic
-
-FORMAT GUIDELINES:
-- Start with a compelling title
-- Use clear temporal markers (years, dates, eras)
-- Write in narrative prose, not bullet points
-- Show how earlier events influence later ones
-- Create a coherent, engaging historical narrative
-
 WORD COUNT REMINDER: Write exactly {min_words}-{max_words} words. Stop at {max_words} words maximum.
-
-Format your response as a narrative chronology with clear temporal markers.
 """
 
     # Theme-specific semantic fields (vocabulary/imagery)
@@ -105,6 +112,7 @@ Format your response as a narrative chronology with clear temporal markers.
     }
 
     @classmethod
+    @functools.lru_cache(maxsize=64)
     def build_prompt(cls, theme, custom_input="", time_span="moderate", 
                     event_density="moderate", narrative_focus="political", 
                     word_range="500-1000 words", 
@@ -113,6 +121,9 @@ Format your response as a narrative chronology with clear temporal markers.
         """
         Build a complete prompt with all variable slots filled
         NOW INCLUDES: Character roster and causal event context
+
+        Memoized: every argument is a string or int, and the output depends
+        only on them, so identical requests (retries, reruns) reuse the prompt
         """
         from config import Config
         
@@ -255,13 +266,10 @@ CRITICAL CAUSALITY RULES:
             semantic_guidance=semantic_guidance,
             custom_specifications=custom_specifications,
             character_roster=character_roster,
-            causal_context=formatted_causal_context
+            causal_context=formatted_causal_context,
+            persona_instructions=persona_instructions
         )
 
-        # Add persona instructions
-        if persona_instructions:
-            system_prompt = persona_instructions + "\n\n" + system_prompt
-
         if character_roster_summary and "ACTIVE CHARACTERS" in character_roster_summary:
             system_prompt += f"""
 
@@ -0,0 +1,73 @@
+
+"""
+Client-side rate limiting for Gemini API calls
+Spaces requests evenly so concurrent workers stay under the per-minute quota,
+and retries transient API errors with exponential backoff
+"""
+import functools
+import random
+import threading
+import time
+
+
+class RateLimiter:
+    """Thread-safe limiter allowing at most `requests_per_minute` acquisitions per minute"""
+
+    def __init__(self, requests_per_minute: int = 60, clock=time.monotonic, sleep=time.sleep):
+        self.interval = 60.0 / requests_per_minute if requests_per_minute > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+        # Injectable so tests can drive the limiter without real waiting
+        self._clock = clock
+        self._sleep = sleep
+
+    def acquire(self):
+        """Block until the next request slot is available"""
+        if not self.interval:
+            return
+
+        with self._lock:
+            now = self._clock()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+
+        # Sleep outside the lock so other workers can reserve later slots
+        delay = slot - now
+        if delay > 0:
+            self._sleep(delay)
+
+
+@functools.lru_cache(maxsize=1)
+def _retryable_errors():
+    """Gemini's rate-limit/transient error types; empty (nothing retried) without the SDK"""
+    try:
+        from google.api_core import exceptions as api_exceptions
+    except ImportError:
+        return ()
+    return (
+        api_exceptions.ResourceExhausted,
+        api_exceptions.ServiceUnavailable,
+        api_exceptions.DeadlineExceeded,
+    )
+
+
+def call_with_backoff(fn, *args, limiter=None, max_retries=5, max_delay=30, **kwargs):
+    """
+    Call fn(*args, **kwargs), retrying rate-limit/transient Gemini errors
+
+    Waits on `limiter` before every attempt so quota is respected up front;
+    retries back off exponentially with jitter. Other errors propagate immediately.
+    """
+    retryable = _retryable_errors()
+
+    for attempt in range(max_retries + 1):
+        if limiter:
+            limiter.acquire()
+        try:
+            return fn(*args, **kwargs)
+        except retryable as e:
+            if attempt == max_retries:
+                raise
+            delay = min(2 ** attempt + random.random(), max_delay)
+            print(f"⏳ {type(e).__name__}, retrying in {delay:.1f}s ({attempt + 1}/{max_retries})")
+            time.sleep(delay)
@@ -0,0 +1,85 @@
+
+from rate_limiter import RateLimiter, call_with_backoff
+
+class FakeClock:
+    """Manual clock: sleep() records the delay instead of waiting"""
+
+    def __init__(self, start=100.0):
+        self.now = start
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, delay):
+        self.sleeps.append(delay)
+        self.now += delay
+
+def test_rate_limiter():
+    print("=== Testing Rate Limiter ===\n")
+
+    # 600 requests/minute = one slot every 0.1s
+    print("1. Sequential acquisitions are spaced by the interval...")
+    clock = FakeClock()
+    limiter = RateLimiter(requests_per_minute=600, clock=clock, sleep=clock.sleep)
+    for _ in range(4):
+        limiter.acquire()
+    print(f"Sleeps: {[round(d, 2) for d in clock.sleeps]}")
+    # First slot is immediate, the remaining three each wait one interval
+    assert [round(d, 6) for d in clock.sleeps] == [0.1, 0.1, 0.1]
+    assert round(clock.now - 100.0, 6) == 0.3
+    print()
+
+    print("2. Simultaneous callers reserve consecutive slots...")
+    clock = FakeClock()
+    sleeps = []
+    # sleep() doesn't advance the clock: every caller arrives at the same instant
+    limiter = RateLimiter(requests_per_minute=600, clock=clock, sleep=sleeps.append)
+    for _ in range(4):
+        limiter.acquire()
+    print(f"Waits: {[round(d, 2) for d in sleeps]}")
+    assert [round(d, 6) for d in sleeps] == [0.1, 0.2, 0.3]
+    print()
+
+    print("3. Idle time is not banked as burst capacity...")
+    clock.now += 10
+    sleeps.clear()
+    limiter.acquire()
+    limiter.acquire()
+    assert [round(d, 6) for d in sleeps] == [0.1]
+    print()
+
+    print("4. Unlimited limiter never blocks...")
+    clock = FakeClock()
+    unlimited = RateLimiter(requests_per_minute=0, clock=clock, sleep=clock.sleep)
+    for _ in range(100):
+        unlimited.acquire()
+    assert clock.sleeps == []
+    print("No waiting")
+    print()
+
+    print("5. call_with_backoff paces calls and passes arguments through...")
+    clock = FakeClock()
+    limiter = RateLimiter(requests_per_minute=600, clock=clock, sleep=clock.sleep)
+    assert call_with_backoff(lambda a, b=0: a + b, 2, b=3, limiter=limiter) == 5
+    assert call_with_backoff(lambda: "ok", limiter=limiter) == "ok"
+    assert [round(d, 6) for d in clock.sleeps] == [0.1]
+
+    # Non-retryable errors propagate on the first attempt
+    attempts = []
+
+    def failing():
+        attempts.append(1)
+        raise ValueError("bad request")
+
+    try:
+        call_with_backoff(failing, limiter=limiter)
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+    assert len(attempts) == 1
+
+    print("\n✅ All tests passed!")
+
+if __name__ == "__main__":
+    test_rate_limiter()
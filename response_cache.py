@@ -0,0 +1,246 @@
+
+"""
+Response caching for Gemini generations
+Identical prompts with identical generation parameters reuse the stored output,
+near-duplicate requests can optionally reuse it via embedding similarity
+"""
+import copy
+import hashlib
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Optional
+
+
+def _open_db(db_path: str, schema: str) -> Optional[sqlite3.Connection]:
+    """
+    Open a SQLite cache file shared across threads (callers serialize access
+    with their own lock); WAL lets other processes read concurrently
+
+    Returns None if the file can't be created or opened, so the cache
+    degrades to memory-only instead of failing the caller
+    """
+    try:
+        db_path = os.path.expanduser(db_path)
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        db = sqlite3.connect(db_path, isolation_level=None, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute(schema)
+        return db
+    except (OSError, sqlite3.Error) as e:
+        print(f"⚠️ Response cache not persisted ({db_path}): {e}")
+        return None
+
+
+class ResponseCache:
+    """
+    Thread-safe response cache with per-entry TTL
+    Entries live in memory; with db_path they are also persisted to SQLite
+    so later processes (e.g. re-running a test batch) can reuse them.
+    The file is opened on first use, not on construction.
+    """
+
+    def __init__(self, ttl: int = 86400, db_path: Optional[str] = None):
+        self.ttl = ttl
+        self._entries = {}  # {key: (expires_at, payload)}
+        self._lock = threading.Lock()
+        self._db_path = db_path  # Cleared once opened (or once opening failed)
+        self._db = None
+
+    def _connect(self):
+        """Open the SQLite file on first use; caller holds _lock"""
+        if self._db_path:
+            self._db = _open_db(
+                self._db_path,
+                "CREATE TABLE IF NOT EXISTS responses "
+                "(key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._db_path = None
+        return self._db
+
+    @staticmethod
+    def make_key(model_name: str, temperature: float, max_tokens: int,
+                 use_multi_stage: bool, prompt: str) -> str:
+        """Build a deterministic SHA-256 key over the prompt and generation params"""
+        raw = f"{model_name}|{temperature}|{max_tokens}|{use_multi_stage}|{prompt}"
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[dict]:
+        """Return a copy of the cached payload, or None on miss/expiry"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._load_from_db(key)
+                if entry is None:
+                    return None
+                self._entries[key] = entry
+
+            expires_at, payload = entry
+            if expires_at < now:
+                del self._entries[key]
+                if self._connect():
+                    self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+
+        # Callers may mutate the payload (entities, stages) - hand out a copy
+        return copy.deepcopy(payload)
+
+    def set(self, key: str, payload: dict, expire: Optional[int] = None):
+        """Store a payload under key for `expire` seconds (defaults to the cache TTL)"""
+        ttl = self.ttl if expire is None else expire
+        if ttl <= 0:
+            return
+
+        expires_at = time.time() + ttl
+        with self._lock:
+            self._entries[key] = (expires_at, copy.deepcopy(payload))
+            if self._connect():
+                value = zlib.compress(json.dumps(payload).encode('utf-8'))
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses (key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, value, expires_at)
+                )
+
+    def _load_from_db(self, key: str):
+        """Read an entry from SQLite as (expires_at, payload); caller holds _lock"""
+        if not self._connect():
+            return None
+
+        row = self._db.execute(
+            "SELECT value, expires_at FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        value, expires_at = row
+        return expires_at, json.loads(zlib.decompress(value).decode('utf-8'))
+
+    def clear(self):
+        """Drop every cached entry"""
+        with self._lock:
+            self._entries.clear()
+            if self._connect():
+                self._db.execute("DELETE FROM responses")
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+
+class SemanticCache:
+    """
+    Embedding-based cache for near-duplicate requests
+    "Roman senate intrigue" and "intrigue in the Roman senate" land on the same entry
+    """
+
+    def __init__(self, embed_fn, threshold: float = 0.9, max_entries: int = 512,
+                 db_path: Optional[str] = None):
+        self._embed_fn = embed_fn  # text -> list of floats
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._entries = []  # [(scope, unit_vector, payload)]
+        self._lock = threading.Lock()
+        self._db_path = db_path  # Cleared once opened (or once opening failed)
+        self._db = None
+
+    def _connect(self):
+        """
+        Open the SQLite file on first use and load the entries persisted by
+        earlier processes; caller holds _lock
+        """
+        if self._db_path:
+            # Entries are written through to SQLite and reloaded by later processes
+            self._db = _open_db(
+                self._db_path,
+                "CREATE TABLE IF NOT EXISTS semantic_entries "
+                "(id INTEGER PRIMARY KEY AUTOINCREMENT, value BLOB NOT NULL)"
+            )
+            self._db_path = None
+            if self._db:
+                rows = self._db.execute(
+                    "SELECT value FROM semantic_entries ORDER BY id DESC LIMIT ?", (self.max_entries,)
+                ).fetchall()
+                persisted = []
+                for (value,) in reversed(rows):
+                    scope, vector, payload = json.loads(zlib.decompress(value).decode('utf-8'))
+                    persisted.append((tuple(scope), vector, payload))
+                self._entries[:0] = persisted
+        return self._db
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Lowercase and collapse whitespace so trivial edits embed identically"""
+        return " ".join(text.lower().split())
+
+    def embed(self, text: str) -> Optional[list]:
+        """Embed normalized text as a unit vector, or None if the embedding call fails"""
+        try:
+            vector = self._embed_fn(self.normalize(text))
+        except Exception as e:
+            print(f"⚠️ Semantic cache embedding failed: {e}")
+            return None
+
+        norm = math.sqrt(sum(x * x for x in vector))
+        if not norm:
+            return None
+        return [x / norm for x in vector]
+
+    def lookup(self, vector: Optional[list], scope: tuple) -> Optional[dict]:
+        """Return a copy of the closest payload in scope if similarity >= threshold"""
+        if vector is None:
+            return None
+
+        best_score, best_payload = 0.0, None
+        with self._lock:
+            self._connect()
+            for entry_scope, entry_vector, payload in self._entries:
+                if entry_scope != scope:
+                    continue
+                # Vectors are unit length, so the dot product is the cosine similarity
+                score = sum(a * b for a, b in zip(vector, entry_vector))
+                if score > best_score:
+                    best_score, best_payload = score, payload
+
+        if best_payload is None or best_score < self.threshold:
+            return None
+
+        print(f"♻️ Semantic cache hit (similarity {best_score:.3f})")
+        return copy.deepcopy(best_payload)
+
+    def add(self, vector: Optional[list], scope: tuple, payload: dict):
+        """Store a payload under its embedding, evicting the oldest entry when full"""
+        if vector is None:
+            return
+
+        with self._lock:
+            self._connect()
+            self._entries.append((scope, vector, copy.deepcopy(payload)))
+            if len(self._entries) > self.max_entries:
+                self._entries.pop(0)
+
+            if self._db:
+                value = zlib.compress(json.dumps([list(scope), vector, payload]).encode('utf-8'))
+                row_id = self._db.execute(
+                    "INSERT INTO semantic_entries (value) VALUES (?)", (value,)
+                ).lastrowid
+                self._db.execute(
+                    "DELETE FROM semantic_entries WHERE id <= ?", (row_id - self.max_entries,)
+                )
+
+    def clear(self):
+        """Drop every cached entry"""
+        with self._lock:
+            self._connect()
+            self._entries.clear()
+            if self._db:
+                self._db.execute("DELETE FROM semantic_entries")
+
+    def __len__(self):
+        with self._lock:
+            self._connect()
+            return len(self._entries)
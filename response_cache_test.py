@@ -0,0 +1,134 @@
+
+import os
+import tempfile
+from response_cache import ResponseCache, SemanticCache
+
+def test_response_cache():
+    print("=== Testing Response Cache ===\n")
+
+    cache = ResponseCache(ttl=60)
+
+    # Keys are deterministic and sensitive to every parameter
+    print("1. Building cache keys...")
+    key = ResponseCache.make_key("models/gemini-1.5-flash", 0.0, 1500, True, "prompt")
+    same_key = ResponseCache.make_key("models/gemini-1.5-flash", 0.0, 1500, True, "prompt")
+    other_key = ResponseCache.make_key("models/gemini-1.5-flash", 0.0, 1500, False, "prompt")
+    print(f"Key: {key[:16]}...")
+    assert key == same_key
+    assert key != other_key
+    print()
+
+    # Miss, then hit
+    print("2. Storing and retrieving a payload...")
+    assert cache.get(key) is None
+    cache.set(key, {"content": "Once upon a time", "entities": {"characters": ["Lyra"]}, "stages_info": []})
+    cached = cache.get(key)
+    print(f"Cached content: {cached['content']}")
+    assert cached["content"] == "Once upon a time"
+    print()
+
+    # Returned payloads are copies
+    print("3. Mutating a returned payload...")
+    cached["entities"]["characters"].append("Alaric")
+    assert cache.get(key)["entities"]["characters"] == ["Lyra"]
+    print("Stored payload unchanged")
+    print()
+
+    # Expired entries are dropped
+    print("4. Expiring entries...")
+    cache.set(other_key, {"content": "stale"}, expire=-1)
+    assert cache.get(other_key) is None
+    print(f"Entries: {len(cache)}")
+
+    print("\n✅ All tests passed!")
+
+def test_persistent_response_cache():
+    print("=== Testing Persistent Response Cache ===\n")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "cache.db")
+        key = ResponseCache.make_key("models/gemini-1.5-flash", 0.0, 1500, False, "prompt")
+
+        print("1. Writing from one cache instance...")
+        writer = ResponseCache(ttl=60, db_path=db_path)
+        writer.set(key, {"content": "Persisted chronicle", "entities": {}, "stages_info": []})
+        print()
+
+        # A fresh instance stands in for a later process
+        print("2. Reading from a new cache instance...")
+        reader = ResponseCache(ttl=60, db_path=db_path)
+        cached = reader.get(key)
+        print(f"Cached content: {cached['content']}")
+        assert cached["content"] == "Persisted chronicle"
+        print()
+
+        print("3. Clearing...")
+        reader.clear()
+        assert ResponseCache(ttl=60, db_path=db_path).get(key) is None
+        print("Cache empty")
+        print()
+
+        # The file is only opened on first use, and an unusable path degrades to memory-only
+        print("4. Lazy open and unwritable paths...")
+        lazy_path = os.path.join(tmp_dir, "lazy", "cache.db")
+        ResponseCache(ttl=60, db_path=lazy_path)
+        assert not os.path.exists(lazy_path)
+
+        blocker = os.path.join(tmp_dir, "not_a_dir")
+        open(blocker, "w").close()
+        memory_only = ResponseCache(ttl=60, db_path=os.path.join(blocker, "cache.db"))
+        memory_only.set(key, {"content": "Memory only"})
+        assert memory_only.get(key)["content"] == "Memory only"
+        print("Fell back to memory")
+
+    print("\n✅ All tests passed!")
+
+def test_semantic_cache():
+    print("=== Testing Semantic Cache ===\n")
+
+    # Bag-of-words embedding stands in for the Gemini embedding model
+    vocabulary = ["roman", "senate", "intrigue", "dragon", "egg"]
+    embed = lambda text: [text.split().count(word) for word in vocabulary]
+    cache = SemanticCache(embed_fn=embed, threshold=0.9)
+    scope = ("models/gemini-1.5-flash", "moderate", "moderate", "political", 5, "Smooth Storyteller")
+
+    print("1. Storing a generation...")
+    vector = cache.embed("Roman   Senate intrigue")
+    cache.add(vector, scope, {"content": "The senators whispered..."})
+    print(f"Entries: {len(cache)}")
+    print()
+
+    print("2. Looking up a reworded request...")
+    hit = cache.lookup(cache.embed("intrigue in the Roman senate"), scope)
+    assert hit is not None and hit["content"] == "The senators whispered..."
+    print()
+
+    print("3. Looking up an unrelated request...")
+    assert cache.lookup(cache.embed("dragon egg"), scope) is None
+    print("No match")
+    print()
+
+    print("4. Looking up with different parameters...")
+    other_scope = scope[:1] + ("epic",) + scope[2:]
+    assert cache.lookup(cache.embed("Roman senate intrigue"), other_scope) is None
+    print("No match outside scope")
+    print()
+
+    # Entries written to SQLite are reloaded by a new instance
+    print("5. Reloading persisted entries...")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "cache.db")
+        writer = SemanticCache(embed_fn=embed, threshold=0.9, db_path=db_path)
+        writer.add(writer.embed("Roman senate intrigue"), scope, {"content": "The senators whispered..."})
+
+        reader = SemanticCache(embed_fn=embed, threshold=0.9, db_path=db_path)
+        hit = reader.lookup(reader.embed("intrigue in the Roman senate"), scope)
+        assert hit is not None and hit["content"] == "The senators whispered..."
+        print(f"Reloaded entries: {len(reader)}")
+
+    print("\n✅ All tests passed!")
+
+if __name__ == "__main__":
+    test_response_cache()
+    test_persistent_response_cache()
+    test_semantic_cache()
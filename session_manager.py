@@ -7,6 +7,27 @@ from pathlib import Path
 from character_manager import CharacterManager
 from causal_chain import CausalEventChain
 
+try:
+    import orjson  # Optional: much faster session (de)serialization
+except ImportError:
+    orjson = None
+
+
+def dump_json(data) -> bytes:
+    """Serialize data as indented UTF-8 JSON (orjson when installed); shared with the app's exports"""
+    if orjson:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, indent=2).encode('utf-8')
+
+
+def _load_json(raw: bytes):
+    """Parse session JSON bytes (orjson when installed)"""
+    return orjson.loads(raw) if orjson else json.loads(raw)
+
+
+# Parsed listing info per session file: {path: (mtime, info)}
+_session_info_cache = {}
+
 
 class SessionManager:
     """Manages persistent sessions with character rosters and event chains"""
@@ -165,8 +186,7 @@ Open Threads: {len(self.event_chain.open_threads)}
         
         filepath = self.sessions_dir / filename
         
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(self.to_dict(), f, indent=2)
+        filepath.write_bytes(dump_json(self.to_dict()))
         
         return str(filepath)
     
@@ -184,8 +204,7 @@ Open Threads: {len(self.event_chain.open_threads)}
         if not filepath.exists():
             raise FileNotFoundError(f"Session file not found: {session_id}")
         
-        with open(filepath, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = _load_json(filepath.read_bytes())
         
         return SessionManager.from_dict(data)
     
@@ -194,30 +213,51 @@ Open Threads: {len(self.event_chain.open_threads)}
         """
         List all available session files
         Returns: List of dicts with session info
+
+        One os.scandir pass finds the files; a file is only re-parsed when its
+        mtime changed since the last listing
         """
         sessions_dir = Path('sessions')
         if not sessions_dir.exists():
             return []
         
+        with os.scandir(sessions_dir) as entries:
+            files = [(entry.path, entry.name, entry.stat().st_mtime)
+                     for entry in entries if entry.name.endswith('.json') and entry.is_file()]
+        
         sessions = []
-        for filepath in sessions_dir.glob('*.json'):
+        for path, filename, mtime in files:
+            cached = _session_info_cache.get(path)
+            if cached and cached[0] == mtime:
+                sessions.append(dict(cached[1]))
+                continue
+            
             try:
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
+                with open(path, 'rb') as f:
+                    data = _load_json(f.read())
                 
-                sessions.append({
-                    'session_id': data.get('session_id', filepath.stem),
-                    'filename': filepath.name,
+                info = {
+                    'session_id': data.get('session_id', filename[:-len('.json')]),
+                    'filename': filename,
                     'theme': data.get('metadata', {}).get('theme', 'Unknown'),
                     'created': data.get('metadata', {}).get('created_at', 'Unknown'),
                     'last_modified': data.get('metadata', {}).get('last_modified', 'Unknown'),
                     'generations': data.get('metadata', {}).get('generation_count', 0),
                     'events': len(data.get('event_chain', {}).get('events', [])),
                     'characters': len(data.get('character_manager', {}).get('roster', {}))
-                })
+                }
             except Exception as e:
                 # Skip corrupted files
                 continue
+            
+            _session_info_cache[path] = (mtime, info)
+            sessions.append(dict(info))
+        
+        # Forget files that were deleted or renamed
+        current_paths = {path for path, _, _ in files}
+        for path in list(_session_info_cache):
+            if path not in current_paths:
+                del _session_info_cache[path]
         
         # Sort by last modified (most recent first)
         sessions.sort(key=lambda x: x['last_modified'], reverse=True)
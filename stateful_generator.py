@@ -3,17 +3,64 @@
 Multi-stage generation with state tracking
 Implements entity tracking and coherence checking
 """
-import google.generativeai as genai
 from datetime import datetime
 import time
 import re
 from config import Config
+from rate_limiter import call_with_backoff
+
+
+def extract_text(response):
+    """Safely extract text from Gemini response"""
+    # Fast path: the SDK accessor covers the usual single-candidate response
+    try:
+        return response.text
+    except Exception:
+        pass
+
+    # Blocked or multi-candidate responses: walk the parts manually
+    for candidate in getattr(response, 'candidates', None) or ():
+        for part in getattr(getattr(candidate, 'content', None), 'parts', None) or ():
+            text = getattr(part, 'text', None)
+            if text:
+                return text
+    return None
+
+
+def stream_text(model, prompt, generation_config, limiter=None, on_chunk=None):
+    """
+    Stream a completion and assemble it chunk by chunk as it arrives,
+    instead of blocking until the whole response has been generated
+
+    on_chunk, if given, is called with each text chunk (e.g. a live UI preview)
+    """
+    response = call_with_backoff(
+        model.generate_content,
+        prompt,
+        generation_config=generation_config,
+        stream=True,
+        limiter=limiter
+    )
+
+    parts = []
+    for chunk in response:
+        text = extract_text(chunk)
+        if text:
+            parts.append(text)
+            if on_chunk:
+                on_chunk(text)
+    return "".join(parts) or None
 
 class StatefulHistoryGenerator:
     """Generator with state tracking across generation stages"""
     
-    def __init__(self, model):
+    def __init__(self, model, limiter=None):
         self.model = model
+        self.limiter = limiter  # Optional shared RateLimiter for API calls
+        self.reset()
+
+    def reset(self):
+        """Clear per-generation state so one instance can serve many generations"""
         self.tracked_entities = {
             'characters': set(),
             'places': set()
@@ -23,6 +70,10 @@ class StatefulHistoryGenerator:
         """
         Enhanced trim with better sentence boundary detection
         PRESERVES metadata sections (anything after --- separator)
+
+        Returns:
+            tuple: (trimmed_text, word_count) - word_count covers narrative + metadata,
+            counted from the words already split here so callers need not re-split
         """
         # FIRST: Check if there's a metadata section and extract it
         metadata_pattern = r'\n-{3,}\s*\n\s*CHARACTERS:\s*\n'
@@ -30,13 +81,15 @@ class StatefulHistoryGenerator:
         
         metadata_match = re.search(metadata_pattern, text, re.IGNORECASE)
         metadata_section = ""
+        metadata_word_count = 0
         narrative_only = text
         
         if metadata_match:
             # Separate narrative from metadata
             narrative_only = text[:metadata_match.start()].strip()
             metadata_section = text[metadata_match.start():].strip()
-            print(f"📋 Detected metadata section ({len(metadata_section.split())} words)")
+            metadata_word_count = len(metadata_section.split())
+            print(f"📋 Detected metadata section ({metadata_word_count} words)")
         
         # NOW: Trim only the NARRATIVE portion (not the metadata)
         words = narrative_only.split()
@@ -45,14 +98,14 @@ class StatefulHistoryGenerator:
         # If within range, return as-is (with metadata reattached)
         if min_words <= word_count <= max_words:
             if metadata_section:
-                return narrative_only + "\n\n" + metadata_section
-            return narrative_only
+                return narrative_only + "\n\n" + metadata_section, word_count + metadata_word_count
+            return narrative_only, word_count
         
         # If too short, return as-is
         if word_count < min_words:
             if metadata_section:
-                return narrative_only + "\n\n" + metadata_section
-            return narrative_only
+                return narrative_only + "\n\n" + metadata_section, word_count + metadata_word_count
+            return narrative_only, word_count
         
         # If too long, trim intelligently
         if word_count > max_words:
@@ -64,6 +117,7 @@ class StatefulHistoryGenerator:
             last_para = trimmed_text.rfind('\n\n')
             if last_para > len(trimmed_text) * 0.85:
                 trimmed_narrative = trimmed_text[:last_para]
+                trimmed_word_count = len(trimmed_narrative.split())
             else:
                 # Find last sentence
                 sentence_ends = [
@@ -75,53 +129,45 @@ class StatefulHistoryGenerator:
                 
                 if last_sentence > len(trimmed_text) * 0.90:
                     trimmed_narrative = trimmed_text[:last_sentence + 1]
+                    # Words are single-space joined, so spaces + 1 is the word count
+                    trimmed_word_count = trimmed_text.count(' ', 0, last_sentence + 1) + 1
                 else:
                     # Fallback: hard cut with ellipsis
                     trimmed_narrative = ' '.join(words[:max_words-1]) + "..."
+                    trimmed_word_count = max_words - 1
             
             # Reattach metadata section
             if metadata_section:
-                return trimmed_narrative + "\n\n" + metadata_section
-            return trimmed_narrative
+                return trimmed_narrative + "\n\n" + metadata_section, trimmed_word_count + metadata_word_count
+            return trimmed_narrative, trimmed_word_count
         
         # Default fallback
         if metadata_section:
-            return narrative_only + "\n\n" + metadata_section
-        return narrative_only
+            return narrative_only + "\n\n" + metadata_section, word_count + metadata_word_count
+        return narrative_only, word_count
  
-    def _extract_text(self, response):
-        """Safely extract text from Gemini response"""
-        if hasattr(response, 'candidates') and response.candidates:
-            for candidate in response.candidates:
-                if hasattr(candidate, 'content') and hasattr(candidate.content, 'parts'):
-                    for part in candidate.content.parts:
-                        if hasattr(part, 'text'):
-                            return part.text
-        
-        try:
-            return response.text
-        except:
-            return None
-    
     def generate_with_state(self, base_prompt, theme, custom_input="", 
                        stages=2, temperature=0.7, max_tokens=2000,
-                       session_manager=None):
+                       session_manager=None, on_chunk=None):
         """
         Generate with multi-stage pipeline and state tracking
         ENHANCED with word count enforcement
+
+        The final stage is streamed when on_chunk is given (e.g. a live UI preview)
         """
         try:
             if stages == 1:
                 # Single-stage generation
-                response = self.model.generate_content(
+                content = stream_text(
+                    self.model,
                     base_prompt,
                     generation_config={
                         'temperature': temperature,
                         'max_output_tokens': max_tokens
-                    }
+                    },
+                    limiter=self.limiter,
+                    on_chunk=on_chunk
                 )
-                
-                content = self._extract_text(response)
                 if not content:
                     return {
                         'success': False,
@@ -132,7 +178,7 @@ class StatefulHistoryGenerator:
                     }
                 
                 # CRITICAL: Enforce word count limit
-                content = self._trim_to_word_limit(content, max_words=1000, min_words=500)
+                content, _ = self._trim_to_word_limit(content, max_words=1000, min_words=500)
                 
                 # Extract entities (use session_manager if available)
                 if session_manager:
@@ -173,15 +219,17 @@ Target: 500-800 words for this initial stage. DO NOT EXCEED 800 WORDS.
 
 IMPORTANT: If your prompt includes character metadata requirements, include them at the end AFTER your narrative content. If not required, do not include any metadata segment after the narrative content, keep it concise with proper formatting for the content.
 """   
-                stage1_response = self.model.generate_content(
+                stage1_response = call_with_backoff(
+                    self.model.generate_content,
                     stage1_prompt,
                     generation_config={
                         'temperature': temperature,
                         'max_output_tokens': max_tokens
-                    }
+                    },
+                    limiter=self.limiter
                 )
                 
-                stage1_content = self._extract_text(stage1_response)
+                stage1_content = extract_text(stage1_response)
                 if not stage1_content:
                     return {
                         'success': False,
@@ -192,8 +240,7 @@ IMPORTANT: If your prompt includes character metadata requirements, include them
                     }
                 
                 # Trim Stage 1 if needed (be aggressive - cap at 850 to leave room for refinement)
-                stage1_content = self._trim_to_word_limit(stage1_content, max_words=850, min_words=500)
-                stage1_word_count = len(stage1_content.split())
+                stage1_content, stage1_word_count = self._trim_to_word_limit(stage1_content, max_words=850, min_words=500)
                 
                 # Extract entities from Stage 1
                 self._extract_entities(stage1_content)
@@ -236,22 +283,22 @@ REMEMBER: Final output must be 500-1000 words. Currently at {stage1_word_count}
 CRITICAL: If the original prompt required a metadata section (like CHARACTERS:), you MUST include it at the end of your output after the narrative content, separated by ---. If not required, do not include any metadata segment after the narrative content, keep it concise with proper formatting for the content.
 """
                 
-                stage2_response = self.model.generate_content(
+                stage2_content = stream_text(
+                    self.model,
                     stage2_prompt,
                     generation_config={
                         'temperature': temperature * 0.9,  # Slightly lower for refinement
                         'max_output_tokens': max_tokens
-                    }
+                    },
+                    limiter=self.limiter,
+                    on_chunk=on_chunk
                 )
-                
-                stage2_content = self._extract_text(stage2_response)
                 if not stage2_content:
                     # Fall back to Stage 1 content if Stage 2 fails
                     stage2_content = stage1_content
                 
                 # CRITICAL: Enforce final word count limit
-                final_content = self._trim_to_word_limit(stage2_content, max_words=1000, min_words=500)
-                final_word_count = len(final_content.split())
+                final_content, final_word_count = self._trim_to_word_limit(stage2_content, max_words=1000, min_words=500)
                 
                 # Re-extract entities from final content
                 self.tracked_entities = {'characters': set(), 'places': set()}
@@ -380,14 +427,3 @@ CRITICAL: If the original prompt required a metadata section (like CHARACTERS:),
         
         if len(self.tracked_entities['places']) > 15:
             self.tracked_entities['places'] = set(list(self.tracked_entities['places'])[:15])
-        """Safely extract text from Gemini response"""
-        if hasattr(re, "candidates") and re.candidates:
-            for candidate in re.candidates:
-                if hasattr(candidate, "content") and hasattr(candidate.content, "parts"):
-                    for part in candidate.content.parts:
-                        if hasattr(part, "text"):
-                            return part.text
-        try:
-            return re.text
-        except:
-            return None
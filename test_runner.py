@@ -2,6 +2,7 @@
 """
 Test runner with enhanced parameter tracking and reporting
 """
+import argparse
 import json
 import csv
 from datetime import datetime
@@ -13,9 +14,10 @@ from config import Config
 class TestRunner:
     """Enhanced test runner with parameter tracking"""
     
-    def __init__(self, output_dir: str = "test_results"):
+    def __init__(self, output_dir: str = "test_results", use_cache: bool = True):
         """Initialize test runner with output directory"""
         self.generator = HistoricalFictionGenerator()
+        self.use_cache = use_cache
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True)
         
@@ -31,7 +33,7 @@ class TestRunner:
         print(f"{'='*60}\n")
         
         # Run generation
-        results = self.generator.batch_generate(test_cases)
+        results = self.generator.batch_generate(test_cases, use_cache=self.use_cache)
         
         # Generate reports
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -288,15 +290,21 @@ class TestRunner:
 
 def main():
     """Main test execution function"""
-    import sys
+    parser = argparse.ArgumentParser(description="Run the Historical Fiction Generator test suites")
+    suite = parser.add_mutually_exclusive_group()
+    suite.add_argument('--quick', action='store_true', help="run the quick test suite")
+    suite.add_argument('--edge', action='store_true', help="run the edge-case test suite")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="force fresh generations instead of reusing cached responses")
+    args = parser.parse_args()
     
-    runner = TestRunner()
+    runner = TestRunner(use_cache=not args.no_cache)
     
     # Determine which test suite to run
-    if len(sys.argv) > 1 and sys.argv[1] == '--quick':
+    if args.quick:
         print("Running QUICK test suite (enhanced parameters)...")
         runner.run_tests(QUICK_TEST_CASES, "quick_test")
-    elif len(sys.argv) > 1 and sys.argv[1] == '--edge':
+    elif args.edge:
         print("Running QUICK test suite (enhanced parameters)...")
         runner.run_tests(EDGE_CASE_TESTS, "edge_test")
     else: